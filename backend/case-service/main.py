@@ -1,5 +1,6 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from sqlalchemy import create_engine
@@ -29,7 +30,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
+# 大于1KB的响应按 Accept-Encoding 压缩
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 # 依赖注入
 def get_db():
@@ -73,7 +77,16 @@ async def health_check():
 
 # 测试用例CRUD
 @app.get("/api/cases")
-async def list_cases(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def list_cases(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    prefer: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    # Prefer: count=exact 时通过 X-Total-Count 返回用例总数，配合 limit=0 只取数量
+    if prefer and "count=exact" in prefer:
+        response.headers["X-Total-Count"] = str(db.query(TestCase).count())
     cases = db.query(TestCase).offset(skip).limit(limit).all()
     return [
         {
@@ -7,6 +7,8 @@ from typing import Dict, List, Any, Set, Tuple
 from dataclasses import dataclass
 import hashlib
 
+from rapidfuzz.distance import Levenshtein
+
 
 @dataclass
 class CaseSignature:
@@ -142,34 +144,12 @@ class CaseDeduplicator:
         if not str1 or not str2:
             return 0.0
 
-        # 简单的编辑距离相似度
-        distance = self._levenshtein_distance(str1, str2)
-        max_len = max(len(str1), len(str2))
-        return 1.0 - (distance / max_len)
+        # 编辑距离相似度（1 - 距离 / 最大长度），由rapidfuzz的C++实现计算
+        return Levenshtein.normalized_similarity(str1, str2)
 
     def _levenshtein_distance(self, s1: str, s2: str) -> int:
         """计算Levenshtein距离"""
-        m, n = len(s1), len(s2)
-        dp = [[0] * (n + 1) for _ in range(m + 1)]
-
-        for i in range(m + 1):
-            dp[i][0] = i
-        for j in range(n + 1):
-            dp[0][j] = j
-
-        for i in range(1, m + 1):
-            for j in range(1, n + 1):
-                if s1[i - 1] == s2[j - 1]:
-                    cost = 0
-                else:
-                    cost = 1
-                dp[i][j] = min(
-                    dp[i - 1][j] + 1,     # 删除
-                    dp[i][j - 1] + 1,     # 插入
-                    dp[i - 1][j - 1] + cost  # 替换
-                )
-
-        return dp[m][n]
+        return Levenshtein.distance(s1, s2)
 
     def _calculate_steps_similarity(
         self,
@@ -3,11 +3,18 @@
 基于探索路径和发现的元素生成测试用例
 """
 
-from typing import Dict, List, Any, Optional, Set
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Set, Tuple
+from dataclasses import dataclass, field as dataclass_field
 from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
 import hashlib
 import json
+import multiprocessing
+import os
+
+
+# 页面数达到该阈值时才使用多进程生成（进程启动和序列化开销较大）
+PARALLEL_MIN_PAGES = 200
 
 
 class TestCasePriority(Enum):
@@ -18,6 +25,15 @@ class TestCasePriority(Enum):
     LOW = "low"            # 次要功能，低优先级
 
 
+# 优先级排序序号（越小越优先）
+PRIORITY_ORDER = {
+    TestCasePriority.CRITICAL: 0,
+    TestCasePriority.HIGH: 1,
+    TestCasePriority.MEDIUM: 2,
+    TestCasePriority.LOW: 3
+}
+
+
 @dataclass
 class TestStep:
     """测试步骤"""
@@ -28,9 +44,9 @@ class TestStep:
     wait_after: int = 1000
 
 
-@dataclass
+@dataclass(slots=True)
 class TestCase:
-    """测试用例"""
+    """测试用例（生成后视为不可变）"""
     name: str
     description: str
     priority: TestCasePriority
@@ -38,33 +54,48 @@ class TestCase:
     assertions: List[Dict[str, Any]]
     tags: List[str]
     estimated_duration: int  # 预估执行时间（秒）
+    # to_dict结果缓存，用例会被多次导出（JSON、覆盖度、接口返回）
+    _dict_cache: Optional[Dict[str, Any]] = dataclass_field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "priority": self.priority.value,
-            "steps": [
-                {
-                    "name": step.name,
-                    "action": step.action,
-                    "selector": step.selector,
-                    "value": step.value
-                }
-                for step in self.steps
-            ],
-            "assertions": self.assertions,
-            "tags": self.tags,
-            "estimated_duration": self.estimated_duration
-        }
+        """转换为字典
+
+        返回缓存字典的浅拷贝，调用方增删顶层键不会影响之后的导出；
+        steps、assertions、tags 等嵌套列表仍与缓存共享，不应原地修改
+        """
+        if self._dict_cache is None:
+            self._dict_cache = {
+                "name": self.name,
+                "description": self.description,
+                "priority": self.priority.value,
+                "steps": [
+                    {
+                        "name": step.name,
+                        "action": step.action,
+                        "selector": step.selector,
+                        "value": step.value
+                    }
+                    for step in self.steps
+                ],
+                "assertions": self.assertions,
+                "tags": self.tags,
+                "estimated_duration": self.estimated_duration
+            }
+        return dict(self._dict_cache)
 
 
 class TestCaseGenerator:
     """测试用例生成器"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        parallel_min_pages: int = PARALLEL_MIN_PAGES
+    ):
         self.generated_cases: List[TestCase] = []
+        # 按页面并行生成用例的进程数，1表示不并行
+        self.max_workers = max_workers or max((os.cpu_count() or 1) - 1, 1)
+        self.parallel_min_pages = parallel_min_pages
 
     def generate_cases_from_exploration(
         self,
@@ -77,31 +108,46 @@ class TestCaseGenerator:
         pages = exploration_results.get("pages", [])
         discovered_cases = exploration_results.get("discovered_cases", [])
 
-        # 1. 从发现的表单生成表单测试用例
-        for page in pages:
-            for form in page.get("forms_found", []):
-                test_case = self._generate_form_test_case(form, page)
-                if test_case:
-                    self.generated_cases.append(test_case)
-
-        # 2. 从导航路径生成导航测试用例
-        navigation_cases = self._generate_navigation_test_cases(pages)
-        self.generated_cases.extend(navigation_cases)
-
-        # 3. 从交互元素生成交互测试用例
-        for page in pages:
-            interactive_cases = self._generate_interaction_test_cases(page)
-            self.generated_cases.extend(interactive_cases)
+        # 各页面的用例生成相互独立，页面较多时分发到多个进程；
+        # 使用 spawn 启动子进程，避免在多线程进程中 fork 导致死锁
+        if self.max_workers > 1 and len(pages) >= self.parallel_min_pages:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                page_results = list(executor.map(_gen_for_page, pages, chunksize=8))
+        else:
+            page_results = [self._generate_page_cases(page) for page in pages]
 
-        # 4. 生成搜索功能测试用例
-        search_cases = self._generate_search_test_cases(pages)
-        self.generated_cases.extend(search_cases)
+        # 按类别合并，保持与逐类别生成时相同的用例顺序：
+        # 1. 表单测试 2. 导航测试 3. 交互测试 4. 搜索功能测试
+        for category in range(4):
+            for cases in page_results:
+                self.generated_cases.extend(cases[category])
 
         # 去重
         self.generated_cases = self._deduplicate_cases()
 
         return self.generated_cases
 
+    def _generate_page_cases(
+        self,
+        page: Dict[str, Any]
+    ) -> Tuple[List[TestCase], List[TestCase], List[TestCase], List[TestCase]]:
+        """为单个页面生成表单、导航、交互、搜索四类测试用例"""
+        form_cases = []
+        for form in page.get("forms_found", []):
+            test_case = self._generate_form_test_case(form, page)
+            if test_case:
+                form_cases.append(test_case)
+
+        return (
+            form_cases,
+            self._generate_navigation_test_cases([page]),
+            self._generate_interaction_test_cases(page),
+            self._generate_search_test_cases([page])
+        )
+
     def _generate_form_test_case(
         self,
         form: Dict[str, Any],
@@ -387,7 +433,7 @@ class TestCaseGenerator:
     def _deduplicate_cases(self) -> List[TestCase]:
         """去重测试用例"""
         unique_cases = []
-        seen_signatures: Set[str] = []
+        seen_signatures: Set[str] = set()
 
         for case in self.generated_cases:
             # 生成用例签名（基于名称和步骤数量）
@@ -401,19 +447,12 @@ class TestCaseGenerator:
 
     def prioritize_cases(self) -> List[TestCase]:
         """对测试用例进行优先级排序"""
-        priority_order = {
-            TestCasePriority.CRITICAL: 0,
-            TestCasePriority.HIGH: 1,
-            TestCasePriority.MEDIUM: 2,
-            TestCasePriority.LOW: 3
-        }
-
-        sorted_cases = sorted(
-            self.generated_cases,
-            key=lambda x: priority_order.get(x.priority, 4)
-        )
+        # 按优先级分桶，一次线性遍历完成稳定排序
+        buckets: List[List[TestCase]] = [[] for _ in range(len(PRIORITY_ORDER) + 1)]
+        for case in self.generated_cases:
+            buckets[PRIORITY_ORDER.get(case.priority, len(PRIORITY_ORDER))].append(case)
 
-        return sorted_cases
+        return [case for bucket in buckets for case in bucket]
 
     def get_case_summary(self) -> Dict[str, Any]:
         """获取测试用例摘要"""
@@ -451,3 +490,10 @@ class TestCaseGenerator:
             indent=2,
             ensure_ascii=False
         )
+
+
+def _gen_for_page(
+    page: Dict[str, Any]
+) -> Tuple[List[TestCase], List[TestCase], List[TestCase], List[TestCase]]:
+    """在工作进程中为单个页面生成测试用例"""
+    return TestCaseGenerator(max_workers=1)._generate_page_cases(page)
@@ -4,9 +4,10 @@
 """
 
 from typing import Dict, List, Any, Set
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-import json
+
+import orjson
 
 
 class CoverageMetric(Enum):
@@ -37,6 +38,37 @@ class CoverageResult:
         }
 
 
+# 预定义的功能类型
+EXPECTED_FEATURES = {
+    "login": "用户登录",
+    "register": "用户注册",
+    "search": "搜索功能",
+    "navigation": "页面导航",
+    "form": "表单提交",
+    "interaction": "用户交互",
+    "e2e": "端到端流程"
+}
+
+
+@dataclass
+class PageStats:
+    """探索页面的累积统计"""
+    urls: List[Any] = field(default_factory=list)
+    total_elements: int = 0
+    total_links: int = 0
+    total_forms: int = 0
+
+
+@dataclass
+class CaseStats:
+    """测试用例的累积统计"""
+    covered_pages: Set[str] = field(default_factory=set)
+    covered_selectors: Set[str] = field(default_factory=set)
+    covered_links: Set[str] = field(default_factory=set)
+    covered_forms: Set[str] = field(default_factory=set)
+    covered_features: Set[str] = field(default_factory=set)
+
+
 class CoverageReporter:
     """覆盖度报告生成器"""
 
@@ -53,50 +85,133 @@ class CoverageReporter:
 
         # 获取探索数据
         pages = exploration_results.get("pages", [])
-        explored_urls = set(p.get("url") for p in pages)
+
+        # 页面和用例各遍历一次，同时累积所有指标需要的数据
+        page_stats = self._collect_page_stats(pages)
+        case_stats = self._collect_case_stats(test_cases)
 
         # 1. 页面覆盖度
-        page_coverage = self._calculate_page_coverage(pages, test_cases)
-        self.results.append(page_coverage)
+        self.results.append(self._build_page_coverage(page_stats, case_stats))
 
         # 2. 元素覆盖度
-        element_coverage = self._calculate_element_coverage(pages, test_cases)
-        self.results.append(element_coverage)
+        self.results.append(self._build_element_coverage(page_stats, case_stats))
 
         # 3. 链接覆盖度
-        link_coverage = self._calculate_link_coverage(pages, test_cases)
-        self.results.append(link_coverage)
+        self.results.append(self._build_link_coverage(page_stats, case_stats))
 
         # 4. 表单覆盖度
-        form_coverage = self._calculate_form_coverage(pages, test_cases)
-        self.results.append(form_coverage)
+        self.results.append(self._build_form_coverage(page_stats, case_stats))
 
         # 5. 功能覆盖度
-        feature_coverage = self._calculate_feature_coverage(test_cases)
-        self.results.append(feature_coverage)
+        self.results.append(self._build_feature_coverage(case_stats))
 
         # 生成报告
         report = self._generate_report()
 
         return report
 
+    def _collect_page_stats(self, pages: List[Dict[str, Any]]) -> PageStats:
+        """单次遍历页面，统计页面、元素、链接、表单总数"""
+        stats = PageStats()
+
+        for page in pages:
+            stats.urls.append(page.get("url"))
+            stats.total_elements += len(page.get("interactive_elements", []))
+            stats.total_links += len(page.get("links_found", []))
+            stats.total_forms += len(page.get("forms_found", []))
+
+        return stats
+
+    def _collect_case_stats(self, test_cases: List[Dict[str, Any]]) -> CaseStats:
+        """单次遍历测试用例，提取各指标覆盖的对象"""
+        stats = CaseStats()
+
+        for case in test_cases:
+            for step in case.get("steps", []):
+                # 如果步骤有value且是URL
+                value = step.get("value", "")
+                if value and (value.startswith("http") or value.startswith("/")):
+                    stats.covered_pages.add(value)
+
+                selector = step.get("selector", "")
+                if selector:
+                    stats.covered_selectors.add(selector)
+
+                    # 点击链接操作（简化：假设包含href的选择器是链接）
+                    if step.get("action") == "click" and ("href=" in selector or selector.startswith("a")):
+                        stats.covered_links.add(selector)
+
+            # 从断言中提取被验证的元素
+            for assertion in case.get("assertions", []):
+                value = assertion.get("value", "")
+                if value and (value.startswith(".") or value.startswith("#") or value.startswith("[")):
+                    stats.covered_selectors.add(value)
+
+            # 从标签中提取被测试的表单和覆盖的功能
+            tags = case.get("tags", [])
+            if "form" in tags:
+                stats.covered_forms.add(case.get("name", ""))
+            for tag in tags:
+                if tag in EXPECTED_FEATURES:
+                    stats.covered_features.add(tag)
+
+        return stats
+
     def _calculate_page_coverage(
         self,
         pages: List[Dict[str, Any]],
         test_cases: List[Dict[str, Any]]
     ) -> CoverageResult:
         """计算页面覆盖度"""
-        total_pages = len(pages)
-        covered_pages = set()
+        return self._build_page_coverage(
+            self._collect_page_stats(pages),
+            self._collect_case_stats(test_cases)
+        )
 
-        # 从测试用例中提取被测试的页面
-        for case in test_cases:
-            steps = case.get("steps", [])
-            for step in steps:
-                # 如果步骤有value且是URL
-                value = step.get("value", "")
-                if value and (value.startswith("http") or value.startswith("/")):
-                    covered_pages.add(value)
+    def _calculate_element_coverage(
+        self,
+        pages: List[Dict[str, Any]],
+        test_cases: List[Dict[str, Any]]
+    ) -> CoverageResult:
+        """计算元素覆盖度"""
+        return self._build_element_coverage(
+            self._collect_page_stats(pages),
+            self._collect_case_stats(test_cases)
+        )
+
+    def _calculate_link_coverage(
+        self,
+        pages: List[Dict[str, Any]],
+        test_cases: List[Dict[str, Any]]
+    ) -> CoverageResult:
+        """计算链接覆盖度"""
+        return self._build_link_coverage(
+            self._collect_page_stats(pages),
+            self._collect_case_stats(test_cases)
+        )
+
+    def _calculate_form_coverage(
+        self,
+        pages: List[Dict[str, Any]],
+        test_cases: List[Dict[str, Any]]
+    ) -> CoverageResult:
+        """计算表单覆盖度"""
+        return self._build_form_coverage(
+            self._collect_page_stats(pages),
+            self._collect_case_stats(test_cases)
+        )
+
+    def _calculate_feature_coverage(
+        self,
+        test_cases: List[Dict[str, Any]]
+    ) -> CoverageResult:
+        """计算功能覆盖度"""
+        return self._build_feature_coverage(self._collect_case_stats(test_cases))
+
+    def _build_page_coverage(self, page_stats: PageStats, case_stats: CaseStats) -> CoverageResult:
+        """根据累积统计生成页面覆盖度"""
+        total_pages = len(page_stats.urls)
+        covered_pages = case_stats.covered_pages
 
         coverage = len(covered_pages) / total_pages if total_pages > 0 else 0
 
@@ -107,39 +222,14 @@ class CoverageReporter:
             percentage=coverage * 100,
             details={
                 "covered_pages": list(covered_pages),
-                "uncovered_pages": [p.get("url") for p in pages if p.get("url") not in covered_pages]
+                "uncovered_pages": [url for url in page_stats.urls if url not in covered_pages]
             }
         )
 
-    def _calculate_element_coverage(
-        self,
-        pages: List[Dict[str, Any]],
-        test_cases: List[Dict[str, Any]]
-    ) -> CoverageResult:
-        """计算元素覆盖度"""
-        total_elements = 0
-        covered_selectors = set()
-
-        # 统计总元素数
-        for page in pages:
-            interactive_elements = page.get("interactive_elements", [])
-            total_elements += len(interactive_elements)
-
-        # 从测试用例中提取被测试的元素
-        for case in test_cases:
-            steps = case.get("steps", [])
-            for step in steps:
-                selector = step.get("selector", "")
-                if selector:
-                    covered_selectors.add(selector)
-
-        # 从断言中提取被验证的元素
-        for case in test_cases:
-            assertions = case.get("assertions", [])
-            for assertion in assertions:
-                value = assertion.get("value", "")
-                if value and (value.startswith(".") or value.startswith("#") or value.startswith("[")):
-                    covered_selectors.add(value)
+    def _build_element_coverage(self, page_stats: PageStats, case_stats: CaseStats) -> CoverageResult:
+        """根据累积统计生成元素覆盖度"""
+        total_elements = page_stats.total_elements
+        covered_selectors = case_stats.covered_selectors
 
         coverage = len(covered_selectors) / total_elements if total_elements > 0 else 0
 
@@ -154,30 +244,10 @@ class CoverageReporter:
             }
         )
 
-    def _calculate_link_coverage(
-        self,
-        pages: List[Dict[str, Any]],
-        test_cases: List[Dict[str, Any]]
-    ) -> CoverageResult:
-        """计算链接覆盖度"""
-        total_links = 0
-        covered_links = set()
-
-        # 统计总链接数
-        for page in pages:
-            links = page.get("links_found", [])
-            total_links += len(links)
-
-        # 从测试用例中提取被测试的链接
-        for case in test_cases:
-            steps = case.get("steps", [])
-            for step in steps:
-                # 点击链接操作
-                if step.get("action") == "click":
-                    selector = step.get("selector", "")
-                    # 简化：假设包含href的选择器是链接
-                    if "href=" in selector or selector.startswith("a"):
-                        covered_links.add(selector)
+    def _build_link_coverage(self, page_stats: PageStats, case_stats: CaseStats) -> CoverageResult:
+        """根据累积统计生成链接覆盖度"""
+        total_links = page_stats.total_links
+        covered_links = case_stats.covered_links
 
         coverage = len(covered_links) / total_links if total_links > 0 else 0
 
@@ -192,25 +262,10 @@ class CoverageReporter:
             }
         )
 
-    def _calculate_form_coverage(
-        self,
-        pages: List[Dict[str, Any]],
-        test_cases: List[Dict[str, Any]]
-    ) -> CoverageResult:
-        """计算表单覆盖度"""
-        total_forms = 0
-        covered_forms = set()
-
-        # 统计总表单数
-        for page in pages:
-            forms = page.get("forms_found", [])
-            total_forms += len(forms)
-
-        # 从测试用例中提取被测试的表单
-        for case in test_cases:
-            tags = case.get("tags", [])
-            if "form" in tags:
-                covered_forms.add(case.get("name", ""))
+    def _build_form_coverage(self, page_stats: PageStats, case_stats: CaseStats) -> CoverageResult:
+        """根据累积统计生成表单覆盖度"""
+        total_forms = page_stats.total_forms
+        covered_forms = case_stats.covered_forms
 
         coverage = len(covered_forms) / total_forms if total_forms > 0 else 0
 
@@ -225,43 +280,22 @@ class CoverageReporter:
             }
         )
 
-    def _calculate_feature_coverage(
-        self,
-        test_cases: List[Dict[str, Any]]
-    ) -> CoverageResult:
-        """计算功能覆盖度"""
-        # 预定义的功能类型
-        expected_features = {
-            "login": "用户登录",
-            "register": "用户注册",
-            "search": "搜索功能",
-            "navigation": "页面导航",
-            "form": "表单提交",
-            "interaction": "用户交互",
-            "e2e": "端到端流程"
-        }
-
-        covered_features = set()
-
-        # 从测试用例的标签中提取覆盖的功能
-        for case in test_cases:
-            tags = case.get("tags", [])
-            for tag in tags:
-                if tag in expected_features:
-                    covered_features.add(tag)
+    def _build_feature_coverage(self, case_stats: CaseStats) -> CoverageResult:
+        """根据累积统计生成功能覆盖度"""
+        covered_features = case_stats.covered_features
 
-        coverage = len(covered_features) / len(expected_features)
+        coverage = len(covered_features) / len(EXPECTED_FEATURES)
 
         return CoverageResult(
             metric=CoverageMetric.FEATURE_COVERAGE,
             covered=len(covered_features),
-            total=len(expected_features),
+            total=len(EXPECTED_FEATURES),
             percentage=coverage * 100,
             details={
-                "covered_features": [expected_features.get(f, f) for f in covered_features],
+                "covered_features": [EXPECTED_FEATURES.get(f, f) for f in covered_features],
                 "uncovered_features": [
-                    expected_features.get(f, f)
-                    for f in expected_features.keys()
+                    EXPECTED_FEATURES.get(f, f)
+                    for f in EXPECTED_FEATURES.keys()
                     if f not in covered_features
                 ]
             }
@@ -333,7 +367,7 @@ class CoverageReporter:
         report = self._generate_report()
 
         if format == "json":
-            return json.dumps(report, indent=2, ensure_ascii=False)
+            return orjson.dumps(report, option=orjson.OPT_INDENT_2).decode('utf-8')
         elif format == "markdown":
             return self._export_to_markdown(report)
         else:
@@ -6,7 +6,9 @@
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 import re
+import sys
 
 
 class ElementType(Enum):
@@ -106,33 +108,36 @@ class SelectorGenerator:
 
     def score_selector(self, selector: str) -> int:
         """为选择器打分"""
-        score = 0
-
-        if selector.startswith('#'):
-            score += self.SELECTOR_PRIORITIES["id"]
-        elif '[data-testid=' in selector:
-            score += self.SELECTOR_PRIORITIES["data-testid"]
-        elif '[data-cy=' in selector:
-            score += self.SELECTOR_PRIORITIES["data-cy"]
-        elif "[name=" in selector:
-            score += self.SELECTOR_PRIORITIES["name"]
-        elif "[aria-label=" in selector:
-            score += self.SELECTOR_PRIORITIES["aria-label"]
-        elif selector.startswith('.'):
-            score += self.SELECTOR_PRIORITIES["class"]
-        else:
-            score += self.SELECTOR_PRIORITIES["tag"]
-
-        return score
+        return _score_selector(selector)
 
     def get_best_selector(self, selectors: List[str]) -> str:
         """获取最佳选择器"""
         if not selectors:
             return "div"
 
-        scored = [(s, self.score_selector(s)) for s in selectors]
-        scored.sort(key=lambda x: x[1], reverse=True)
-        return scored[0][0]
+        # max返回第一个最高分的选择器，与稳定降序排序后取首个一致
+        return max(selectors, key=_score_selector)
+
+
+@lru_cache(maxsize=8192)
+def _score_selector(selector: str) -> int:
+    """为选择器打分（选择器在元素间大量重复，结果按选择器缓存）"""
+    priorities = SelectorGenerator.SELECTOR_PRIORITIES
+
+    if selector.startswith('#'):
+        return priorities["id"]
+    elif '[data-testid=' in selector:
+        return priorities["data-testid"]
+    elif '[data-cy=' in selector:
+        return priorities["data-cy"]
+    elif "[name=" in selector:
+        return priorities["name"]
+    elif "[aria-label=" in selector:
+        return priorities["aria-label"]
+    elif selector.startswith('.'):
+        return priorities["class"]
+    else:
+        return priorities["tag"]
 
 
 class ElementRecognizer:
@@ -142,10 +147,10 @@ class ElementRecognizer:
         self.selector_generator = SelectorGenerator()
 
         # 交互元素标签
-        self.interactive_tags = {
+        self.interactive_tags = frozenset({
             'button', 'a', 'input', 'select', 'textarea',
             'option', 'label', 'details', 'summary'
-        }
+        })
 
         # 元素类型模式
         self.type_patterns = {
@@ -194,7 +199,7 @@ class ElementRecognizer:
     def recognize_element(self, element) -> RecognizedElement:
         """识别单个元素"""
         # 提取元素属性
-        tag = element.name if hasattr(element, 'name') else 'div'
+        tag = sys.intern(element.name) if hasattr(element, 'name') else 'div'
         attributes = {k: v for k, v in element.attrs.items()}
         text = element.get_text(strip=True) if hasattr(element, 'get_text') else ""
 
@@ -214,8 +219,9 @@ class ElementRecognizer:
             'type': attributes.get('type')
         }
 
-        selectors = self.selector_generator.generate_selectors(element_data)
-        best_selector = self.selector_generator.get_best_selector(selectors)
+        # 同一选择器在大量元素间重复出现，驻留后共享同一字符串对象
+        selectors = [sys.intern(s) for s in self.selector_generator.generate_selectors(element_data)]
+        best_selector = sys.intern(self.selector_generator.get_best_selector(selectors))
 
         # 判断是否可点击和可交互
         is_clickable = self._is_clickable(tag, attributes, text)
@@ -8,8 +8,10 @@ from typing import Dict, List, Any, Optional, Set
 from dataclasses import dataclass
 from playwright.async_api import async_playwright, Page, Browser, BrowserContext
 import json
+import os
 import uuid
 from datetime import datetime
+from urllib.parse import urlparse
 
 from state_machine import PageStateMachine, PageState
 from page_crawler import PageCrawler
@@ -19,6 +21,14 @@ from case_deduplicator import CaseDeduplicator
 from coverage_reporter import CoverageReporter
 
 
+# 并发探索的工作协程数（每个协程一个浏览器标签页）
+EXPLORE_CONCURRENCY = int(os.getenv("EXPLORE_CONCURRENCY", "4"))
+# 同一域名同时加载的页面数上限
+PER_DOMAIN_CONCURRENCY = int(os.getenv("EXPLORE_PER_DOMAIN_CONCURRENCY", "2"))
+# 页面加载完成后等待动态内容渲染的时间（秒）
+PAGE_SETTLE_SECONDS = 1
+
+
 @dataclass
 class ExploreSession:
     """探索会话信息"""
@@ -57,17 +67,28 @@ class ExploreSession:
 class WebExplorer:
     """网站探索引擎"""
 
-    def __init__(self, max_depth: int = 3, max_pages: int = 20, strategy: str = "mixed"):
+    def __init__(
+        self,
+        max_depth: int = 3,
+        max_pages: int = 20,
+        strategy: str = "mixed",
+        concurrency: int = EXPLORE_CONCURRENCY,
+        per_domain_concurrency: int = PER_DOMAIN_CONCURRENCY
+    ):
         self.max_depth = max_depth
         self.max_pages = max_pages
         self.strategy = strategy
+        self.concurrency = max(1, concurrency)
+        self.per_domain_concurrency = max(1, per_domain_concurrency)
+        self._domain_semaphores: Dict[str, asyncio.Semaphore] = {}
         self.state_machine = PageStateMachine(max_depth, max_pages)
         self.navigator = AdaptiveNavigator()
         self.sessions: Dict[str, ExploreSession] = {}
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
-        self.case_generator = TestCaseGenerator()
+        # 服务进程内有 uvicorn 和 Playwright 的线程，用例生成保持串行，多进程只用于离线调用
+        self.case_generator = TestCaseGenerator(max_workers=1)
         self.case_deduplicator = CaseDeduplicator()
         self.coverage_reporter = CoverageReporter()
 
@@ -109,8 +130,94 @@ class WebExplorer:
         self.sessions[explore_id] = session
         return explore_id
 
+    def _domain_semaphore(self, url: str) -> asyncio.Semaphore:
+        """获取域名对应的并发信号量（按需创建），避免同一站点被过多并发请求压垮"""
+        domain = urlparse(url).netloc
+        semaphore = self._domain_semaphores.get(domain)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_domain_concurrency)
+            self._domain_semaphores[domain] = semaphore
+        return semaphore
+
+    async def _explore_page(
+        self,
+        session: ExploreSession,
+        page: Page,
+        url: str,
+        discovered_cases: List[Dict[str, Any]]
+    ):
+        """探索单个页面：加载、去重、分析并把新链接加入队列"""
+        depth = self.state_machine.pages[url].depth if url in self.state_machine.pages else 0
+
+        if depth > self.max_depth:
+            return
+
+        session.current_url = url
+
+        try:
+            # 同域名限流只覆盖对目标站点发起请求的导航阶段，等待渲染和读取内容时不占用名额
+            async with self._domain_semaphore(url):
+                # 导航到页面
+                await page.goto(url, wait_until="networkidle", timeout=10000)
+
+            # 等待页面加载
+            await asyncio.sleep(PAGE_SETTLE_SECONDS)
+
+            # 获取页面内容
+            content = await page.content()
+
+            # 检查重复内容（指纹只计算一次，标记访问时复用）
+            signature = self.state_machine.content_signature(content)
+            if self.state_machine.is_duplicate_content(content, signature):
+                return
+
+            # 标记为已访问
+            self.state_machine.mark_visited(url, content, signature)
+            session.pages_explored = len(self.state_machine.visited_urls)
+
+            # 使用爬虫分析页面
+            crawler = PageCrawler(url)
+            page_data = await crawler.analyze_page(page, url)
+
+            # 更新统计
+            session.elements_found += page_data.get("stats", {}).get("interactive_elements_count", 0)
+
+            # 发现新链接并添加到队列
+            for link in page_data.get("links", []):
+                link_url = link.url
+                if link_url and not self.state_machine.is_explored(link_url):
+                    link_depth = depth + 1
+                    self.state_machine.add_page(link_url, link_depth, url)
+
+                    # 根据策略决定是否添加到队列
+                    if self.navigator.planner.should_explore_link(link.__dict__):
+                        self.state_machine.add_to_queue(link_url, url)
+
+            # 生成测试建议
+            suggestions = self.navigator.planner.generate_test_suggestions(page_data)
+            for suggestion in suggestions:
+                if suggestion not in discovered_cases:
+                    discovered_cases.append(suggestion)
+
+            # 更新页面信息
+            if url in self.state_machine.pages:
+                page_state = self.state_machine.pages[url]
+                page_state.links_found = [l.url for l in page_data.get("links", [])]
+                page_state.forms_found = page_data.get("forms", [])
+                page_state.interactive_elements = page_data.get("interactive_elements", [])
+
+        except Exception as e:
+            # 加载或分析失败的页面不保留入队记录，其他页面再次链接到它时可以重试
+            self.state_machine.release_url(url)
+            print(f"Error exploring {url}: {e}")
+
     async def explore(self, explore_id: str) -> Dict[str, Any]:
-        """执行探索"""
+        """执行探索
+
+        启动 concurrency 个工作协程，每个协程使用独立的浏览器标签页，
+        从状态机队列中取页面并发探索；队列为空时等待其他协程发现新链接，
+        全部空闲或达到最大页面数时结束。
+        """
         if explore_id not in self.sessions:
             raise ValueError(f"Session {explore_id} not found")
 
@@ -125,76 +232,42 @@ class WebExplorer:
             self.state_machine.add_page(session.start_url, 0)
             self.state_machine.add_to_queue(session.start_url, "")
 
-            total_elements = 0
-            discovered_cases = []
-
-            # 开始探索循环
-            while self.state_machine.should_continue():
-                next_page = self.state_machine.get_next_page()
-                if not next_page:
-                    break
-
-                url, parent_url = next_page
-                depth = self.state_machine.pages[url].depth if url in self.state_machine.pages else 0
-
-                if depth > self.max_depth:
-                    continue
-
-                session.current_url = url
-
-                # 导航到页面
-                try:
-                    await self.page.goto(url, wait_until="networkidle", timeout=10000)
-
-                    # 等待页面加载
-                    await asyncio.sleep(1)
-
-                    # 获取页面内容
-                    content = await self.page.content()
-
-                    # 检查重复内容
-                    if self.state_machine.is_duplicate_content(content):
-                        continue
-
-                    # 标记为已访问
-                    self.state_machine.mark_visited(url, content)
-                    session.pages_explored = len(self.state_machine.visited_urls)
-
-                    # 使用爬虫分析页面
-                    crawler = PageCrawler(url)
-                    page_data = await crawler.analyze_page(self.page, url)
-
-                    # 更新统计
-                    total_elements += page_data.get("stats", {}).get("interactive_elements_count", 0)
-                    session.elements_found = total_elements
-
-                    # 发现新链接并添加到队列
-                    for link in page_data.get("links", []):
-                        link_url = link.get("url")
-                        if link_url and not self.state_machine.is_explored(link_url):
-                            link_depth = depth + 1
-                            self.state_machine.add_page(link_url, link_depth, url)
-
-                            # 根据策略决定是否添加到队列
-                            if self.navigator.planner.should_explore_link(link.__dict__):
-                                self.state_machine.add_to_queue(link_url, url)
-
-                    # 生成测试建议
-                    suggestions = self.navigator.planner.generate_test_suggestions(page_data)
-                    for suggestion in suggestions:
-                        if suggestion not in discovered_cases:
-                            discovered_cases.append(suggestion)
-
-                    # 更新页面信息
-                    if url in self.state_machine.pages:
-                        page_state = self.state_machine.pages[url]
-                        page_state.links_found = [l.url for l in page_data.get("links", [])]
-                        page_state.forms_found = page_data.get("forms", [])
-                        page_state.interactive_elements = page_data.get("interactive_elements", [])
-
-                except Exception as e:
-                    print(f"Error exploring {url}: {e}")
-                    continue
+            discovered_cases: List[Dict[str, Any]] = []
+            queue_changed = asyncio.Condition()
+            in_flight = 0
+
+            async def next_url() -> Optional[str]:
+                """取下一个要探索的页面，没有更多页面时返回None"""
+                nonlocal in_flight
+                async with queue_changed:
+                    while True:
+                        # 正在探索的页面也计入最大页面数
+                        if len(self.state_machine.visited_urls) + in_flight < self.max_pages:
+                            next_page = self.state_machine.get_next_page()
+                            if next_page:
+                                in_flight += 1
+                                return next_page[0]
+                        if in_flight == 0:
+                            return None
+                        await queue_changed.wait()
+
+            async def worker(page: Page):
+                nonlocal in_flight
+                while (url := await next_url()) is not None:
+                    try:
+                        await self._explore_page(session, page, url, discovered_cases)
+                    finally:
+                        async with queue_changed:
+                            in_flight -= 1
+                            queue_changed.notify_all()
+
+            # 第一个工作协程复用主标签页，其余各自新建
+            pages = [self.page] + [await self.context.new_page() for _ in range(self.concurrency - 1)]
+            try:
+                await asyncio.gather(*(worker(page) for page in pages))
+            finally:
+                for page in pages[1:]:
+                    await page.close()
 
             # 生成测试用例
             session.cases_generated = len(discovered_cases)
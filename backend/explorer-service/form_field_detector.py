@@ -8,6 +8,8 @@ from dataclasses import dataclass
 from enum import Enum
 import re
 
+import ahocorasick
+
 
 class FieldType(Enum):
     """表单字段类型"""
@@ -143,6 +145,23 @@ class FormFieldDetector:
             },
         }
 
+        # 将所有关键词编译为一个Aho-Corasick自动机，每个标识只需扫描一次
+        keyword_owners: Dict[str, List[FieldType]] = {}
+        for field_type, pattern in self.field_patterns.items():
+            for keyword in pattern["keywords"]:
+                keyword_owners.setdefault(keyword, []).append(field_type)
+
+        self._keyword_automaton = ahocorasick.Automaton()
+        for keyword, owners in keyword_owners.items():
+            self._keyword_automaton.add_word(keyword, (keyword, owners))
+        self._keyword_automaton.make_automaton()
+
+        # input类型 -> 接受该类型的字段类型
+        self._type_owners: Dict[str, List[FieldType]] = {}
+        for field_type, pattern in self.field_patterns.items():
+            for valid_type in set(pattern["types"]):
+                self._type_owners.setdefault(valid_type, []).append(field_type)
+
     def detect_field_type(self, field_info: Dict[str, Any]) -> FieldDetection:
         """检测字段类型"""
         # 提取字段信息
@@ -158,11 +177,11 @@ class FormFieldDetector:
         best_match = None
         best_confidence = 0.0
 
+        confidences = self._calculate_confidences(identifiers)
+
         # 遍历所有字段类型模式
-        for field_type, pattern in self.field_patterns.items():
-            confidence = self._calculate_confidence(
-                identifiers, field_type, pattern
-            )
+        for field_type in self.field_patterns:
+            confidence = confidences.get(field_type, 0.0)
 
             if confidence > best_confidence:
                 best_confidence = confidence
@@ -185,36 +204,31 @@ class FormFieldDetector:
             suggestions=suggestions
         )
 
-    def _calculate_confidence(
-        self,
-        identifiers: List[str],
-        field_type: FieldType,
-        pattern: Dict[str, Any]
-    ) -> float:
-        """计算字段类型的置信度"""
-        confidence = 0.0
-        keywords = pattern["keywords"]
-        valid_types = pattern["types"]
+    def _calculate_confidences(self, identifiers: List[str]) -> Dict[FieldType, float]:
+        """一次扫描计算所有字段类型的置信度"""
+        confidences: Dict[FieldType, float] = {}
 
         for identifier in identifiers:
-            if identifier:
-                # 检查关键词匹配
-                for keyword in keywords:
-                    if keyword in identifier:
-                        # 完全匹配给予更高分
-                        if identifier == keyword:
-                            confidence += 0.8
-                        # 部分匹配给予中等分
-                        elif keyword in identifier:
-                            confidence += 0.5
-
-        # 检查input类型匹配
-        for identifier in identifiers:
-            if identifier and identifier in valid_types:
-                confidence += 0.3
+            if not identifier:
+                continue
+
+            # 检查关键词匹配（同一关键词在同一标识中只计一次）
+            matched = {}
+            for _, (keyword, owners) in self._keyword_automaton.iter(identifier):
+                matched[keyword] = owners
+
+            for keyword, owners in matched.items():
+                # 完全匹配给予更高分，部分匹配给予中等分
+                score = 0.8 if identifier == keyword else 0.5
+                for field_type in owners:
+                    confidences[field_type] = confidences.get(field_type, 0.0) + score
+
+            # 检查input类型匹配
+            for field_type in self._type_owners.get(identifier, []):
+                confidences[field_type] = confidences.get(field_type, 0.0) + 0.3
 
         # 规范化置信度
-        return min(confidence, 1.0)
+        return {field_type: min(confidence, 1.0) for field_type, confidence in confidences.items()}
 
     def _infer_from_type(self, input_type: str, field_info: Dict[str, Any]) -> FieldType:
         """根据input类型推断字段类型"""
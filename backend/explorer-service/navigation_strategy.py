@@ -7,6 +7,32 @@ from typing import List, Dict, Any, Optional, Callable
 from enum import Enum
 import random
 
+import ahocorasick
+import numpy as np
+
+
+# 各优先级关键词的得分
+KEYWORD_LEVEL_SCORES = {"high": 10, "medium": 5, "low": 2}
+# 链接类型得分
+LINK_TYPE_SCORES = {"internal": 3, "external": -5}
+
+# MIXED排序键的位布局：第63位为“非当前深度”标志，第32-62位为深度，低32位为取反后的分数
+_MIXED_DEPTH_MAX = (1 << 31) - 1
+_MIXED_SCORE_MAX = (1 << 32) - 1
+
+
+def mixed_sort_keys(scores: np.ndarray, depths: np.ndarray, current_depth: int) -> np.ndarray:
+    """把MIXED策略的排序条件打包成uint64键，升序排列即为探索顺序
+
+    当前深度的链接排在最前，其余链接按深度升序；同组内按分数降序。
+    深度和分数均为非负数，超出位宽的值会被截断。
+    """
+    other_depth = (depths != current_depth).astype(np.uint64)
+    depth_bits = np.clip(depths, 0, _MIXED_DEPTH_MAX).astype(np.uint64)
+    score_bits = np.uint64(_MIXED_SCORE_MAX) - np.clip(scores, 0, _MIXED_SCORE_MAX).astype(np.uint64)
+    return (other_depth << np.uint64(63)) | (depth_bits << np.uint64(32)) | score_bits
+
+
 
 class NavigationStrategy(Enum):
     """导航策略类型"""
@@ -26,40 +52,60 @@ class NavigationPlanner:
             "medium": ["search", "filter", "profile", "settings", "account"],
             "low": ["about", "contact", "help", "faq", "terms", "privacy"]
         }
+        # 首次评分时按 priority_keywords 构建
+        self._keyword_automaton: Optional[ahocorasick.Automaton] = None
 
-    def calculate_link_priority(self, link_info: Dict[str, Any]) -> int:
-        """计算链接的优先级分数"""
-        score = 0
-        url = link_info.get('url', '').lower()
-        text = link_info.get('text', '').lower()
-
-        # 基于关键词评分
+    def _build_keyword_automaton(self) -> ahocorasick.Automaton:
+        """构建优先级关键词自动机，一次扫描即可匹配全部关键词"""
+        automaton = ahocorasick.Automaton()
         for level, keywords in self.priority_keywords.items():
             for keyword in keywords:
-                if keyword in url or keyword in text:
-                    if level == 'high':
-                        score += 10
-                    elif level == 'medium':
-                        score += 5
-                    else:
-                        score += 2
-
-        # 链接类型评分
-        link_type = link_info.get('type', '')
-        if link_type == 'internal':
-            score += 3
-        elif link_type == 'external':
-            score -= 5
-
-        # URL深度评分（越浅越好）
-        depth = link_info.get('depth', 0)
-        score -= depth
-
-        # 有文本的链接更好
-        if text and len(text.strip()) > 0:
-            score += 2
-
-        return max(0, score)
+                automaton.add_word(keyword, (keyword, KEYWORD_LEVEL_SCORES.get(level, 2)))
+        automaton.make_automaton()
+        return automaton
+
+    def _keyword_score(self, url: str, text: str) -> int:
+        """计算关键词得分，每个关键词只计一次"""
+        if self._keyword_automaton is None:
+            self._keyword_automaton = self._build_keyword_automaton()
+        automaton = self._keyword_automaton
+        if not len(automaton):
+            return 0
+
+        matched = {}
+        for _, (keyword, keyword_score) in automaton.iter(url):
+            matched[keyword] = keyword_score
+        for _, (keyword, keyword_score) in automaton.iter(text):
+            matched[keyword] = keyword_score
+        return sum(matched.values())
+
+    def score_links(self, links: List[Dict[str, Any]]) -> np.ndarray:
+        """批量计算链接优先级分数
+
+        先把链接拆成按列存放的特征数组（关键词得分、类型得分、深度、是否有文本），
+        再整体向量化计算分数。
+        """
+        count = len(links)
+        keyword_scores = np.empty(count, dtype=np.int64)
+        type_scores = np.empty(count, dtype=np.int64)
+        depths = np.empty(count, dtype=np.int64)
+        has_text = np.empty(count, dtype=np.bool_)
+
+        for i, link_info in enumerate(links):
+            url = link_info.get('url', '').lower()
+            text = link_info.get('text', '').lower()
+            keyword_scores[i] = self._keyword_score(url, text)
+            type_scores[i] = LINK_TYPE_SCORES.get(link_info.get('type', ''), 0)
+            depths[i] = link_info.get('depth', 0)
+            has_text[i] = bool(text.strip())
+
+        # 关键词 + 链接类型 - URL深度（越浅越好）+ 有文本的链接更好
+        scores = keyword_scores + type_scores - depths + 2 * has_text
+        return np.maximum(scores, 0)
+
+    def calculate_link_priority(self, link_info: Dict[str, Any]) -> int:
+        """计算链接的优先级分数"""
+        return int(self.score_links([link_info])[0])
 
     def sort_links_by_strategy(
         self,
@@ -68,30 +114,30 @@ class NavigationPlanner:
         max_depth: int
     ) -> List[Dict[str, Any]]:
         """根据策略对链接进行排序"""
+        if not links:
+            return []
+
+        # 分数和深度各计算一次，排序在numpy中完成（lexsort最后一个键为主键，且排序稳定）
+        neg_scores = -self.score_links(links)
+        depths = np.fromiter((l.get('depth', 0) for l in links), dtype=np.int64, count=len(links))
 
         if self.strategy == NavigationStrategy.BFS:
             # BFS：优先探索同一深度的页面
-            return sorted(links, key=lambda x: (x.get('depth', 0), -self.calculate_link_priority(x)))
+            order = np.lexsort((neg_scores, depths))
 
         elif self.strategy == NavigationStrategy.DFS:
             # DFS：优先探索更深的页面
-            return sorted(links, key=lambda x: (-x.get('depth', 0), -self.calculate_link_priority(x)))
+            order = np.lexsort((neg_scores, -depths))
 
         elif self.strategy == NavigationStrategy.PRIORITY:
             # 基于优先级：按优先级分数排序
-            return sorted(links, key=lambda x: -self.calculate_link_priority(x))
+            order = np.argsort(neg_scores, kind="stable")
 
         else:  # MIXED
-            # 混合策略：在当前深度优先，然后进入下一深度
-            current_depth_links = [l for l in links if l.get('depth', 0) == current_depth]
-            other_links = [l for l in links if l.get('depth', 0) != current_depth]
-
-            # 当前深度按优先级排序
-            current_depth_links = sorted(current_depth_links, key=lambda x: -self.calculate_link_priority(x))
-            # 其他深度按深度和优先级排序
-            other_links = sorted(other_links, key=lambda x: (x.get('depth', 0), -self.calculate_link_priority(x)))
+            # 混合策略：在当前深度优先（按优先级），然后按深度和优先级进入下一深度
+            order = np.argsort(mixed_sort_keys(-neg_scores, depths, current_depth), kind="stable")
 
-            return current_depth_links + other_links
+        return [links[i] for i in order]
 
     def select_next_links(
         self,
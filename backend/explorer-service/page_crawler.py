@@ -5,10 +5,57 @@
 
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
+from functools import lru_cache
 from urllib.parse import urljoin, urlparse, urlunparse
 import re
 
 
+# 不需要标准化的特殊链接前缀（小写比较）
+_SKIP_PREFIXES = ('javascript:', 'mailto:', 'tel:', 'sms:', 'ftp:')
+# 需要忽略的链接前缀、文件后缀和路径片段（小写比较）
+_IGNORE_PREFIXES = ('javascript:', 'mailto:', 'tel:')
+_IGNORE_SUFFIXES = (
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.zip', '.rar', '.tar', '.gz'
+)
+_IGNORE_PATH_RE = re.compile(r'/(?:logout|signout)')
+
+
+@lru_cache(maxsize=8192)
+def _normalize_url(base_url: str, url: str) -> Optional[str]:
+    """标准化URL（同一链接会在多个页面中重复出现，结果按 base_url 和 url 缓存）"""
+    try:
+        # 处理锚点链接
+        if url.startswith('#'):
+            return None
+
+        # 处理javascript/mailto/tel等特殊链接
+        if url.lower().startswith(_SKIP_PREFIXES):
+            return None
+
+        # 相对URL转绝对URL
+        absolute_url = urljoin(base_url, url)
+
+        # 移除fragment和部分query参数
+        parsed = urlparse(absolute_url)
+
+        # 只允许http和https
+        if parsed.scheme not in ('http', 'https'):
+            return None
+
+        # 保留重要的query参数
+        return urlunparse((
+            parsed.scheme,
+            parsed.netloc,
+            parsed.path,
+            None,
+            parsed.query,
+            None
+        ))
+    except Exception:
+        return None
+
+
 @dataclass
 class LinkInfo:
     """链接信息"""
@@ -55,64 +102,26 @@ class PageCrawler:
 
     def is_internal_link(self, url: str) -> bool:
         """检查是否为内部链接"""
+        # 站内相对路径无需解析
+        if url.startswith('/') and not url.startswith('//'):
+            return True
         parsed = urlparse(url)
         return parsed.netloc == "" or parsed.netloc == self.base_domain
 
     def normalize_url(self, url: str) -> Optional[str]:
         """标准化URL"""
-        try:
-            # 处理锚点链接
-            if url.startswith('#'):
-                return None
-
-            # 处理javascript链接
-            if url.lower().startswith('javascript:'):
-                return None
-
-            # 处理mailto/tel等特殊链接
-            if re.match(r'^(mailto|tel|sms|ftp):', url.lower()):
-                return None
-
-            # 相对URL转绝对URL
-            absolute_url = urljoin(self.base_url, url)
-
-            # 移除fragment和部分query参数
-            parsed = urlparse(absolute_url)
-            # 保留重要的query参数
-            clean_url = urlunparse((
-                parsed.scheme,
-                parsed.netloc,
-                parsed.path,
-                None,
-                parsed.query,
-                None
-            ))
-
-            # 只允许http和https
-            if parsed.scheme not in ['http', 'https']:
-                return None
-
-            return clean_url
-        except Exception:
-            return None
+        return _normalize_url(self.base_url, url)
 
     def should_ignore_url(self, url: str) -> bool:
         """判断URL是否应该被忽略"""
-        ignore_patterns = [
-            r'\.(pdf|doc|docx|xls|xlsx|ppt|pptx|zip|rar|tar|gz)$',
-            r'#',
-            r'^javascript:',
-            r'^mailto:',
-            r'^tel:',
-            r'/logout',
-            r'/signout',
-        ]
-
-        for pattern in ignore_patterns:
-            if re.search(pattern, url, re.IGNORECASE):
-                return True
-
-        return False
+        if '#' in url:
+            return True
+
+        lowered = url.lower()
+        if lowered.startswith(_IGNORE_PREFIXES) or lowered.endswith(_IGNORE_SUFFIXES):
+            return True
+
+        return _IGNORE_PATH_RE.search(lowered) is not None
 
     async def crawl_links(self, page_content: str) -> List[LinkInfo]:
         """爬取页面中的链接"""
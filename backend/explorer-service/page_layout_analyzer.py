@@ -6,6 +6,19 @@
 from typing import Dict, List, Any, Optional, Set
 from dataclasses import dataclass
 from enum import Enum
+from hashlib import blake2b
+import os
+import sys
+
+import diskcache
+
+
+# 分析结果磁盘缓存（按HTML内容哈希索引，跨探索会话复用），
+# 默认关闭，设置 ANALYSIS_CACHE_DIR 环境变量或传入 cache_dir 时启用
+ANALYSIS_CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR")
+ANALYSIS_CACHE_SIZE_LIMIT = 1 << 30
+# 分析逻辑变更时递增，使旧缓存失效
+ANALYSIS_CACHE_VERSION = 1
 
 
 class PageRegion(Enum):
@@ -43,7 +56,13 @@ class RegionInfo:
 class PageLayoutAnalyzer:
     """页面布局分析器"""
 
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = ANALYSIS_CACHE_DIR):
+        # 分析结果缓存，cache_dir为None时禁用
+        self._cache = None
+        if cache_dir:
+            self._cache = diskcache.Cache(cache_dir, size_limit=ANALYSIS_CACHE_SIZE_LIMIT)
+            self._cache.stats(enable=True)
+
         # 语义化标签映射
         self.semantic_tags = {
             "header": PageRegion.HEADER,
@@ -73,8 +92,41 @@ class PageLayoutAnalyzer:
         # 交互元素标签
         self.interactive_tags = ["button", "a", "input", "select", "textarea"]
 
+    def _cache_key(self, kind: str, dom_content: str) -> str:
+        """生成缓存键"""
+        digest = blake2b(dom_content.encode('utf-8'), digest_size=16).hexdigest()
+        return f"{kind}:{ANALYSIS_CACHE_VERSION}:{digest}"
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """获取分析缓存统计"""
+        if self._cache is None:
+            return {"enabled": False, "hits": 0, "misses": 0, "entries": 0, "size": 0}
+
+        hits, misses = self._cache.stats()
+        return {
+            "enabled": True,
+            "hits": hits,
+            "misses": misses,
+            "entries": len(self._cache),
+            "size": self._cache.volume()
+        }
+
     def analyze_page(self, dom_content: str) -> Dict[str, Any]:
         """分析页面布局"""
+        if self._cache is None:
+            return self._analyze_page(dom_content)
+
+        key = self._cache_key("layout", dom_content)
+        report = self._cache.get(key)
+        if report is None:
+            report = self._analyze_page(dom_content)
+            # 分析失败的结果不缓存
+            if "error" not in report:
+                self._cache.set(key, report)
+        return report
+
+    def _analyze_page(self, dom_content: str) -> Dict[str, Any]:
+        """分析页面布局（不使用缓存）"""
         try:
             from bs4 import BeautifulSoup
             soup = BeautifulSoup(dom_content, 'html.parser')
@@ -239,14 +291,14 @@ class PageLayoutAnalyzer:
 
     def _generate_selector(self, element) -> str:
         """生成元素的CSS选择器"""
-        # 优先使用ID
+        # 优先使用ID（选择器在各区域间大量重复，驻留以共享字符串）
         if element.get('id'):
-            return f"#{element.get('id')}"
+            return sys.intern(f"#{element.get('id')}")
 
         # 其次使用类名
         classes = element.get('class', [])
         if classes:
-            return f".{'.'.join(classes[:2])}"  # 只使用前两个类名
+            return sys.intern(f".{'.'.join(classes[:2])}")  # 只使用前两个类名
 
         # 使用标签名
         return element.name if hasattr(element, 'name') else 'div'
@@ -291,8 +343,26 @@ class PageLayoutAnalyzer:
 
     def suggest_test_actions(self, dom_content: str) -> List[Dict[str, Any]]:
         """基于页面布局建议测试操作"""
+        if self._cache is None:
+            return self._suggest_test_actions(dom_content)
+
+        key = self._cache_key("actions", dom_content)
+        suggestions = self._cache.get(key)
+        if suggestions is None:
+            report = self.analyze_page(dom_content)
+            suggestions = self._suggest_from_report(report)
+            # 与 analyze_page 一致，分析失败时的建议不缓存
+            if "error" not in report:
+                self._cache.set(key, suggestions)
+        return suggestions
+
+    def _suggest_test_actions(self, dom_content: str) -> List[Dict[str, Any]]:
+        """基于页面布局建议测试操作（不使用缓存）"""
+        return self._suggest_from_report(self.analyze_page(dom_content))
+
+    def _suggest_from_report(self, report: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """根据布局分析报告生成测试操作建议"""
         suggestions = []
-        report = self.analyze_page(dom_content)
 
         # 检测到的区域
         regions = report.get("regions", [])
@@ -3,31 +3,228 @@
 用于记录和管理网站探索过程中的页面状态和访问路径
 """
 
-from typing import Dict, List, Set, Optional, Tuple
-from collections import deque
-import hashlib
+from typing import Dict, List, Set, Optional, Tuple, Iterator
+from collections import deque, Counter
+from collections.abc import Mapping
+from hashlib import blake2b
 import json
+import re
+
+import lxml.html
+import numpy as np
+from lxml import etree
+
+
+SIMHASH_BITS = 64
+# 指纹汉明距离小于该值的页面视为近似重复；默认0，只识别规范化后内容完全相同的页面
+NEAR_DUPLICATE_DISTANCE = 0
+
+# 页面表的初始容量
+PAGE_TABLE_INITIAL_CAPACITY = 64
+
+_DIGITS_RE = re.compile(r"\d+")
+# 页面公共外壳（导航、页头、页脚、侧栏），计算指纹前去掉，只比较正文
+_CHROME_XPATH = (
+    "//nav | //header | //footer | //aside"
+    " | //*[@role='navigation' or @role='banner' or @role='contentinfo' or @role='complementary']"
+)
+# 每个字节中置位的比特数，用于向量化计算汉明距离
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _content_tokens(dom_content: str) -> List[str]:
+    """提取页面正文的规范化词元
+
+    有 <main> 时只取主内容区，否则去掉导航、页头、页脚和侧栏；忽略标签属性并去掉数字
+    （日期、计数器等）。标签名每种只计一次，避免共用模板的大量 div/span/li 盖过正文。
+    """
+    try:
+        doc = lxml.html.fromstring(dom_content)
+        main = doc.xpath("//main | //*[@role='main']")
+        if main:
+            doc = main[0]
+        else:
+            for el in doc.xpath(_CHROME_XPATH):
+                if el.getparent() is not None:
+                    el.drop_tree()
+        tags = {el.tag for el in doc.iter() if isinstance(el.tag, str)}
+        text = doc.text_content()
+    except (etree.ParserError, ValueError):
+        tags = set()
+        text = dom_content
+
+    return _DIGITS_RE.sub(" ", text).split() + sorted(tags)
+
+
+def content_fingerprint(dom_content: str, near_duplicates: bool = True) -> int:
+    """计算页面正文的64位指纹
+
+    near_duplicates 为 True 时返回SimHash，内容相近的页面得到汉明距离很小的指纹；
+    为 False 时返回规范化正文的哈希，只有正文完全相同的页面指纹相同。
+    """
+    tokens = _content_tokens(dom_content)
+    if not near_duplicates:
+        digest = blake2b(" ".join(tokens).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    weights = [0] * SIMHASH_BITS
+    for token, count in Counter(tokens).items():
+        token_hash = int.from_bytes(blake2b(token.encode('utf-8'), digest_size=8).digest(), "big")
+        for i in range(SIMHASH_BITS):
+            if token_hash >> i & 1:
+                weights[i] += count
+            else:
+                weights[i] -= count
+
+    signature = 0
+    for i, weight in enumerate(weights):
+        if weight > 0:
+            signature |= 1 << i
+    return signature
+
+
+class PageTable(Mapping):
+    """按列存储的页面表（URL -> PageState）
+
+    深度、访问状态、指纹等定长字段存放在连续的numpy数组中，按行号索引，
+    避免每个页面一个Python对象；统计和去重时可以直接对整列做向量化计算。
+    容量不足时数组按倍数扩容。
+    """
+
+    def __init__(self, capacity: int = PAGE_TABLE_INITIAL_CAPACITY):
+        capacity = max(1, capacity)
+        self._index: Dict[str, int] = {}
+        self.urls: List[str] = []
+        self.parent_urls: List[Optional[str]] = []
+        self.depths = np.zeros(capacity, dtype=np.int16)
+        self.visited = np.zeros(capacity, dtype=np.bool_)
+        self.signatures = np.zeros(capacity, dtype=np.uint64)
+        self.has_signature = np.zeros(capacity, dtype=np.bool_)
+        self.elements_found = np.zeros(capacity, dtype=np.int32)
+        # 变长字段仍按行号存放在列表中
+        self.links_found: List[list] = []
+        self.forms_found: List[list] = []
+        self.interactive_elements: List[list] = []
+
+    def _grow(self):
+        """数组容量翻倍"""
+        for name in ("depths", "visited", "signatures", "has_signature", "elements_found"):
+            column = getattr(self, name)
+            grown = np.zeros(len(column) * 2, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def append(self, url: str, depth: int, parent_url: Optional[str] = None) -> int:
+        """追加一行页面记录，返回行号"""
+        idx = len(self.urls)
+        if idx == len(self.depths):
+            self._grow()
+        self._index[url] = idx
+        self.urls.append(url)
+        self.parent_urls.append(parent_url)
+        self.depths[idx] = depth
+        self.links_found.append([])
+        self.forms_found.append([])
+        self.interactive_elements.append([])
+        return idx
+
+    def visited_signatures(self) -> np.ndarray:
+        """已访问且有指纹的页面的指纹列"""
+        count = len(self.urls)
+        mask = self.visited[:count] & self.has_signature[:count]
+        return self.signatures[:count][mask]
+
+    def __getitem__(self, url: str) -> "PageState":
+        return PageState(self, self._index[url])
+
+    def __contains__(self, url) -> bool:
+        return url in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.urls)
+
+    def __len__(self) -> int:
+        return len(self.urls)
 
 
 class PageState:
-    """表示单个页面状态"""
-
-    def __init__(self, url: str, depth: int, parent_url: Optional[str] = None):
-        self.url = url
-        self.depth = depth
-        self.parent_url = parent_url
-        self.visited = False
-        self.dom_fingerprint = None
-        self.elements_found = 0
-        self.links_found = []
-        self.forms_found = []
-        self.interactive_elements = []
-
-    def set_dom_fingerprint(self, dom_content: str):
-        """生成DOM指纹用于去重"""
-        # 简化：使用URL和页面内容的哈希
-        content_hash = hashlib.md5(dom_content.encode('utf-8')).hexdigest()[:16]
-        self.dom_fingerprint = content_hash
+    """表示单个页面状态（页面表中一行的视图）"""
+
+    __slots__ = ("_table", "_idx")
+
+    def __init__(self, table: PageTable, idx: int):
+        self._table = table
+        self._idx = idx
+
+    @property
+    def url(self) -> str:
+        return self._table.urls[self._idx]
+
+    @property
+    def depth(self) -> int:
+        return int(self._table.depths[self._idx])
+
+    @property
+    def parent_url(self) -> Optional[str]:
+        return self._table.parent_urls[self._idx]
+
+    @property
+    def visited(self) -> bool:
+        return bool(self._table.visited[self._idx])
+
+    @visited.setter
+    def visited(self, value: bool):
+        self._table.visited[self._idx] = value
+
+    @property
+    def content_signature(self) -> Optional[int]:
+        if not self._table.has_signature[self._idx]:
+            return None
+        return int(self._table.signatures[self._idx])
+
+    @property
+    def dom_fingerprint(self) -> Optional[str]:
+        signature = self.content_signature
+        return None if signature is None else f"{signature:016x}"
+
+    @property
+    def elements_found(self) -> int:
+        return int(self._table.elements_found[self._idx])
+
+    @elements_found.setter
+    def elements_found(self, value: int):
+        self._table.elements_found[self._idx] = value
+
+    @property
+    def links_found(self) -> list:
+        return self._table.links_found[self._idx]
+
+    @links_found.setter
+    def links_found(self, value: list):
+        self._table.links_found[self._idx] = value
+
+    @property
+    def forms_found(self) -> list:
+        return self._table.forms_found[self._idx]
+
+    @forms_found.setter
+    def forms_found(self, value: list):
+        self._table.forms_found[self._idx] = value
+
+    @property
+    def interactive_elements(self) -> list:
+        return self._table.interactive_elements[self._idx]
+
+    @interactive_elements.setter
+    def interactive_elements(self, value: list):
+        self._table.interactive_elements[self._idx] = value
+
+    def set_dom_fingerprint(self, dom_content: str, signature: Optional[int] = None):
+        """生成DOM指纹用于去重，已计算过的指纹通过 signature 传入"""
+        if signature is None:
+            signature = content_fingerprint(dom_content)
+        self._table.signatures[self._idx] = signature
+        self._table.has_signature[self._idx] = True
 
     def to_dict(self) -> dict:
         """转换为字典"""
@@ -47,37 +244,63 @@ class PageState:
 class PageStateMachine:
     """页面状态机，管理探索过程"""
 
-    def __init__(self, max_depth: int = 3, max_pages: int = 20):
+    def __init__(
+        self,
+        max_depth: int = 3,
+        max_pages: int = 20,
+        near_duplicate_distance: int = NEAR_DUPLICATE_DISTANCE
+    ):
         self.max_depth = max_depth
         self.max_pages = max_pages
-        self.pages: Dict[str, PageState] = {}  # URL -> PageState
+        # 0表示只识别完全相同的指纹
+        self.near_duplicate_distance = near_duplicate_distance
+        self.pages = PageTable(max(max_pages, PAGE_TABLE_INITIAL_CAPACITY))  # URL -> PageState
         self.visited_urls: Set[str] = set()
-        self.visited_fingerprints: Set[str] = set()
-        self.exploration_queue: deque[Tuple[str, str]] = deque()  # (url, parent_url)
+        self.visited_fingerprints: Set[int] = set()  # 已访问页面的SimHash指纹
+        # 已入队且尚未访问完成的URL（包括正在探索的页面），避免同一页面被多个父页面重复入队
+        self.queued_urls: Set[str] = set()
+        # (url, parent_url)，长度上限为 max_pages
+        self.exploration_queue: deque[Tuple[str, str]] = deque(maxlen=max_pages)
         self.exploration_path: List[str] = []  # 当前探索路径
+        self._depth_counter: Counter = Counter()  # 深度 -> 页面数量，随 add_page 增量维护
         self.current_depth = 0
 
     def add_page(self, url: str, depth: int, parent_url: Optional[str] = None) -> PageState:
         """添加页面到状态机"""
         if url not in self.pages:
-            page = PageState(url, depth, parent_url)
-            self.pages[url] = page
+            self.pages.append(url, depth, parent_url)
+            self._depth_counter[depth] += 1
         return self.pages[url]
 
-    def mark_visited(self, url: str, dom_content: Optional[str] = None):
+    def content_signature(self, dom_content: str) -> int:
+        """按当前去重模式计算页面指纹，可传给 is_duplicate_content 和 mark_visited 复用"""
+        return content_fingerprint(dom_content, near_duplicates=self.near_duplicate_distance > 0)
+
+    def mark_visited(self, url: str, dom_content: Optional[str] = None, signature: Optional[int] = None):
         """标记页面为已访问"""
         if url in self.pages:
-            self.pages[url].visited = True
+            page = self.pages[url]
+            page.visited = True
             self.visited_urls.add(url)
+            self.queued_urls.discard(url)
             if dom_content:
-                self.pages[url].set_dom_fingerprint(dom_content)
-                if self.pages[url].dom_fingerprint:
-                    self.visited_fingerprints.add(self.pages[url].dom_fingerprint)
+                if signature is None:
+                    signature = self.content_signature(dom_content)
+                page.set_dom_fingerprint(dom_content, signature)
+                self.visited_fingerprints.add(page.content_signature)
 
     def add_to_queue(self, url: str, parent_url: str):
         """添加页面到探索队列"""
-        if url not in self.visited_urls and len(self.exploration_queue) < self.max_pages:
+        if url in self.visited_urls or url in self.queued_urls:
+            return
+        # deque满时append会丢弃最早入队的页面，这里保持拒绝新页面的语义
+        if len(self.exploration_queue) < self.exploration_queue.maxlen:
             self.exploration_queue.append((url, parent_url))
+            self.queued_urls.add(url)
+
+    def release_url(self, url: str):
+        """页面加载失败时调用，允许该页面之后从其他父页面重新入队"""
+        self.queued_urls.discard(url)
 
     def get_next_page(self) -> Optional[Tuple[str, str]]:
         """从队列获取下一个要探索的页面"""
@@ -89,10 +312,19 @@ class PageStateMachine:
         """检查页面是否已被探索"""
         return url in self.visited_urls
 
-    def is_duplicate_content(self, dom_content: str) -> bool:
-        """检查内容是否重复"""
-        fingerprint = hashlib.md5(dom_content.encode('utf-8')).hexdigest()[:16]
-        return fingerprint in self.visited_fingerprints
+    def is_duplicate_content(self, dom_content: str, signature: Optional[int] = None) -> bool:
+        """检查内容是否重复（near_duplicate_distance > 0 时包括近似重复）"""
+        fingerprint = self.content_signature(dom_content) if signature is None else signature
+        if fingerprint in self.visited_fingerprints:
+            return True
+
+        # 近似重复：与任一已访问页面的指纹汉明距离足够小（对指纹列整体计算）
+        signatures = self.pages.visited_signatures()
+        if not len(signatures) or self.near_duplicate_distance <= 0:
+            return False
+        xor = signatures ^ np.uint64(fingerprint)
+        distances = _POPCOUNT_TABLE[xor.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+        return bool((distances < self.near_duplicate_distance).any())
 
     def get_exploration_stats(self) -> dict:
         """获取探索统计信息"""
@@ -107,10 +339,7 @@ class PageStateMachine:
 
     def _count_pages_by_depth(self) -> Dict[int, int]:
         """统计各深度的页面数量"""
-        depth_count = {}
-        for page in self.pages.values():
-            depth_count[page.depth] = depth_count.get(page.depth, 0) + 1
-        return depth_count
+        return dict(self._depth_counter)
 
     def should_continue(self) -> bool:
         """判断是否应该继续探索"""
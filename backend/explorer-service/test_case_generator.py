@@ -3,6 +3,8 @@
 测试自动用例生成功能
 """
 
+import json
+
 import pytest
 from case_generator import TestCaseGenerator, TestCase, TestStep, TestCasePriority
 from case_deduplicator import CaseDeduplicator, CaseSignature
@@ -135,6 +137,13 @@ class TestTestCaseGenerator:
         assert len(case_dict["steps"]) == 2
         assert len(case_dict["assertions"]) == 1
 
+        # 重复导出复用缓存，修改返回结果不影响之后的导出
+        case_dict["name"] = "已修改"
+        again = test_case.to_dict()
+        assert again is not case_dict
+        assert again["steps"] is case_dict["steps"]
+        assert again["name"] == "测试用例"
+
     def test_generate_cases_from_exploration(self):
         """测试从探索结果生成测试用例"""
         generator = TestCaseGenerator()
@@ -167,6 +176,37 @@ class TestTestCaseGenerator:
         login_cases = [c for c in cases if "登录" in c.name]
         assert len(login_cases) > 0
 
+    def test_generate_cases_from_exploration_parallel(self):
+        """测试多进程生成用例与串行结果一致"""
+        pages = [
+            {
+                "url": f"http://example.com/page{i}",
+                "depth": i % 3,
+                "forms_found": [
+                    {
+                        "action": f"/form{i}",
+                        "method": "POST",
+                        "fields": [{"type": "text", "name": "title", "selector": "#title"}],
+                        "submit_button": "#submit"
+                    }
+                ],
+                "links_found": [f"http://example.com/page{i + 1}"],
+                "interactive_elements": [
+                    {"type": "button", "selector": f"#btn{i}", "text": f"Button {i}"}
+                ]
+            }
+            for i in range(100)
+        ]
+        exploration_results = {"pages": pages, "discovered_cases": []}
+
+        serial = TestCaseGenerator(max_workers=1).generate_cases_from_exploration(exploration_results)
+        parallel = TestCaseGenerator(max_workers=2, parallel_min_pages=1).generate_cases_from_exploration(
+            exploration_results
+        )
+
+        assert len(parallel) > 0
+        assert [c.to_dict() for c in parallel] == [c.to_dict() for c in serial]
+
     def test_deduplicate_cases(self):
         """测试用例去重"""
         generator = TestCaseGenerator()
@@ -239,6 +279,32 @@ class TestTestCaseGenerator:
         assert prioritized[1].priority == TestCasePriority.HIGH
         assert prioritized[2].priority == TestCasePriority.LOW
 
+    def test_prioritize_cases_stable(self):
+        """测试相同优先级的用例保持原有顺序"""
+        generator = TestCaseGenerator()
+
+        priorities = [TestCasePriority.LOW, TestCasePriority.MEDIUM, TestCasePriority.CRITICAL] * 4
+        generator.generated_cases = [
+            TestCase(
+                name=f"用例{i}",
+                description="",
+                priority=priority,
+                steps=[],
+                assertions=[],
+                tags=[],
+                estimated_duration=1
+            )
+            for i, priority in enumerate(priorities)
+        ]
+
+        prioritized = generator.prioritize_cases()
+
+        expected = sorted(
+            generator.generated_cases,
+            key=lambda c: ["critical", "high", "medium", "low"].index(c.priority.value)
+        )
+        assert [c.name for c in prioritized] == [c.name for c in expected]
+
     def test_get_case_summary(self):
         """测试获取用例摘要"""
         generator = TestCaseGenerator()
@@ -521,6 +587,7 @@ class TestCoverageReporter:
 
         assert json_str is not None
         assert isinstance(json_str, str)
+        assert json.loads(json_str)["metrics"] == report["metrics"]
 
     def test_export_to_markdown(self):
         """测试导出Markdown"""
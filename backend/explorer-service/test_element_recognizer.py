@@ -347,6 +347,39 @@ class TestPageLayoutAnalyzer:
         # 应该生成表单测试和导航测试建议
         assert len(actions) > 0
 
+    def test_analysis_cache(self, tmp_path):
+        """测试相同HTML的分析结果缓存"""
+        analyzer = PageLayoutAnalyzer(cache_dir=str(tmp_path))
+
+        html = '<html><nav><a href="/home">Home</a></nav><main>Main</main></html>'
+
+        first = analyzer.analyze_page(html)
+        second = analyzer.analyze_page(html)
+
+        # 第二次调用应命中缓存且结果一致
+        assert first == second
+        stats = analyzer.cache_stats()
+        assert stats["enabled"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_analysis_cache_disabled(self):
+        """测试禁用分析缓存"""
+        analyzer = PageLayoutAnalyzer(cache_dir=None)
+
+        report = analyzer.analyze_page("<html><main>Main</main></html>")
+
+        assert report["total_regions"] > 0
+        assert not analyzer.cache_stats()["enabled"]
+
+    def test_analysis_cache_skips_errors(self, tmp_path, monkeypatch):
+        """测试分析失败时的报告和操作建议都不缓存"""
+        analyzer = PageLayoutAnalyzer(cache_dir=str(tmp_path))
+        monkeypatch.setattr(analyzer, "_analyze_page", lambda html: {"error": "boom", "regions": []})
+
+        assert analyzer.suggest_test_actions("<html></html>") == []
+        assert analyzer.cache_stats()["entries"] == 0
+
 
 # 运行测试的入口
 if __name__ == "__main__":
@@ -32,6 +32,26 @@ class TestPageStateMachine:
         assert page.depth == 0
         assert not page.visited
 
+    def test_page_table_growth(self):
+        """测试页面表扩容后数据保持不变，且页面视图的修改会写回表中"""
+        sm = PageStateMachine(max_depth=3, max_pages=20)
+        for i in range(200):
+            sm.add_page(f"http://example.com/page{i}", i % 4, "http://example.com")
+
+        assert len(sm.pages) == 200
+        assert sm.pages["http://example.com/page199"].depth == 3
+        assert [page.depth for page in sm.pages.values()][:5] == [0, 1, 2, 3, 0]
+
+        page = sm.pages["http://example.com/page7"]
+        page.links_found = ["http://example.com/a", "http://example.com/b"]
+        sm.mark_visited("http://example.com/page7", "<html><body>hello</body></html>")
+
+        page_dict = sm.pages["http://example.com/page7"].to_dict()
+        assert page_dict["visited"]
+        assert page_dict["links_count"] == 2
+        assert len(page_dict["dom_fingerprint"]) == 16
+        assert sm.pages["http://example.com/page8"].dom_fingerprint is None
+
     def test_mark_visited(self):
         """测试标记页面为已访问"""
         sm = PageStateMachine(max_depth=3, max_pages=20)
@@ -50,6 +70,67 @@ class TestPageStateMachine:
         # 相同内容应该被识别为重复
         assert sm.is_duplicate_content("<html>content</html>")
 
+    def test_near_duplicate_detection(self):
+        """测试近似重复内容检测"""
+        sm = PageStateMachine(max_depth=3, max_pages=20, near_duplicate_distance=3)
+        sm.add_page("http://example.com/list?page=1", 0)
+        sm.mark_visited(
+            "http://example.com/list?page=1",
+            '<html><body><h1>订单列表</h1><p class="a">共 12 条记录</p>'
+            '<a href="/orders/1">查看详情</a></body></html>'
+        )
+
+        # 只有数字和属性不同的页面应该被识别为重复
+        assert sm.is_duplicate_content(
+            '<html><body><h1>订单列表</h1><p class="b">共 345 条记录</p>'
+            '<a href="/orders/2">查看详情</a></body></html>'
+        )
+        # 内容明显不同的页面不应被识别为重复
+        assert not sm.is_duplicate_content(
+            '<html><body><form><input name="username"><input name="password">'
+            '<button>登录系统</button></form></body></html>'
+        )
+
+    def test_shared_template_not_duplicate(self):
+        """测试共用模板但正文不同的页面不被识别为重复"""
+        template = (
+            '<html><body><div class="nav"><ul>'
+            + '<li><div><span></span></div></li>' * 100
+            + '</ul></div><div class="content"><p>{}</p></div></body></html>'
+        )
+        sm = PageStateMachine(max_depth=3, max_pages=20)
+        sm.add_page("http://example.com/article/1", 0)
+        sm.mark_visited(
+            "http://example.com/article/1",
+            template.format("alpha bravo charlie delta echo foxtrot golf hotel india juliet "
+                            "kilo lima mike november oscar papa quebec romeo sierra tango")
+        )
+
+        assert not sm.is_duplicate_content(
+            template.format("apple banana cherry grape lemon mango melon orange peach pear "
+                            "plum kiwi lime fig date olive apricot guava papaya quince")
+        )
+
+    def test_shared_chrome_not_duplicate(self):
+        """测试导航、页脚等公共区域文字很多而正文不同的页面不被识别为重复"""
+        menu = " ".join(f"菜单{chr(ord('a') + i % 26)}{i // 26}" for i in range(150))
+        words = [f"word{chr(ord('a') + i % 26)}{chr(ord('a') + i // 26)}" for i in range(40 * 20)]
+
+        for layout, distance in (
+            ("<nav>{menu}</nav><div>{body}</div><footer>{menu}</footer>", 3),
+            ('<div class="sidebar">{menu} {menu}</div><div>{body}</div>', 0),
+        ):
+            sm = PageStateMachine(max_depth=3, max_pages=50, near_duplicate_distance=distance)
+            for i in range(40):
+                url = f"http://example.com/item/{i}"
+                html = "<html><body>" + layout.format(menu=menu, body=" ".join(words[i * 20:(i + 1) * 20])) + "</body></html>"
+                signature = sm.content_signature(html)
+                assert not sm.is_duplicate_content(html, signature)
+                sm.add_page(url, 1)
+                sm.mark_visited(url, html, signature)
+
+            assert len(sm.visited_fingerprints) == 40
+
     def test_queue_management(self):
         """测试队列管理"""
         sm = PageStateMachine(max_depth=3, max_pages=20)
@@ -77,6 +158,34 @@ class TestPageStateMachine:
         # 队列应该只包含max_pages个页面
         assert len(sm.exploration_queue) == 2
 
+        # 因队列已满被拒绝的页面，腾出空间后仍可入队
+        sm.get_next_page()
+        sm.add_to_queue("http://example.com/page3", "")
+        assert sm.exploration_queue[-1][0] == "http://example.com/page3"
+
+    def test_queue_deduplication(self):
+        """测试同一页面不会被重复入队"""
+        sm = PageStateMachine(max_depth=3, max_pages=20)
+
+        sm.add_to_queue("http://example.com/page1", "http://example.com/a")
+        sm.add_to_queue("http://example.com/page1", "http://example.com/b")
+        assert len(sm.exploration_queue) == 1
+
+        # 出队后也不会再次入队
+        sm.get_next_page()
+        sm.add_to_queue("http://example.com/page1", "http://example.com/c")
+        assert len(sm.exploration_queue) == 0
+        assert "http://example.com/page1" in sm.queued_urls
+
+        sm.add_to_queue("http://example.com/page2", "http://example.com/a")
+        assert sm.exploration_queue[-1][0] == "http://example.com/page2"
+
+        # 加载失败的页面释放后可从其他父页面重新入队
+        sm.get_next_page()
+        sm.release_url("http://example.com/page2")
+        sm.add_to_queue("http://example.com/page2", "http://example.com/b")
+        assert sm.exploration_queue[-1] == ("http://example.com/page2", "http://example.com/b")
+
     def test_should_continue(self):
         """测试是否应该继续探索"""
         sm = PageStateMachine(max_depth=3, max_pages=20)
@@ -107,6 +216,10 @@ class TestPageStateMachine:
         assert stats["pages_at_depth"][0] == 1
         assert stats["pages_at_depth"][1] == 2
 
+        # 重复添加同一页面不会重复计数
+        sm.add_page("http://example.com/page2", 1)
+        assert sm.get_exploration_stats()["pages_at_depth"][1] == 2
+
 
 class TestNavigationStrategy:
     """导航策略测试"""
@@ -140,6 +253,24 @@ class TestNavigationStrategy:
         external_score = planner.calculate_link_priority(external_link)
         assert login_score > external_score
 
+    def test_score_links_batch(self):
+        """测试批量链接评分与单个评分一致"""
+        planner = NavigationPlanner(NavigationStrategy.MIXED)
+
+        links = [
+            {"url": "http://example.com/login", "text": "Login", "type": "internal", "depth": 0},
+            {"url": "http://example.com/search?q=1", "text": "", "type": "internal", "depth": 2},
+            {"url": "http://other-site.com", "text": "External", "type": "external", "depth": 1},
+            {"url": "http://example.com/about", "depth": 9},
+        ]
+
+        scores = planner.score_links(links)
+        assert list(scores) == [planner.calculate_link_priority(l) for l in links]
+        # 关键词在URL和文本中同时出现只计一次：10 + 3 + 2
+        assert scores[0] == 15
+        # 分数不会小于0
+        assert scores[3] == 0
+
     def test_should_explore_link(self):
         """测试链接是否应该被探索"""
         planner = NavigationPlanner(NavigationStrategy.MIXED)
@@ -190,6 +321,27 @@ class TestNavigationStrategy:
         depths = [l["depth"] for l in sorted_links]
         assert depths == sorted(depths, reverse=True)
 
+    def test_mixed_sorting(self):
+        """测试混合策略排序"""
+        planner = NavigationPlanner(NavigationStrategy.MIXED)
+
+        links = [
+            {"url": "http://example.com/page1", "depth": 2},
+            {"url": "http://example.com/page2", "depth": 1},
+            {"url": "http://example.com/login", "text": "Login", "depth": 1},
+            {"url": "http://example.com/page3", "depth": 0},
+        ]
+
+        sorted_links = planner.sort_links_by_strategy(links, current_depth=1, max_depth=3)
+
+        # 当前深度的链接在前且按优先级排序，其余按深度排序
+        assert [l["url"] for l in sorted_links] == [
+            "http://example.com/login",
+            "http://example.com/page2",
+            "http://example.com/page3",
+            "http://example.com/page1",
+        ]
+
     def test_generate_test_suggestions(self):
         """测试生成测试建议"""
         planner = NavigationPlanner(NavigationStrategy.MIXED)
@@ -252,6 +404,15 @@ class TestPageCrawler:
         # JavaScript链接应该返回None
         assert crawler.normalize_url("javascript:alert(1)") is None
 
+    def test_normalize_url_cache_per_base(self):
+        """测试URL标准化缓存按基础URL区分"""
+        crawler = PageCrawler("http://example.com")
+        other = PageCrawler("http://other-site.com")
+
+        assert crawler.normalize_url("/page") == "http://example.com/page"
+        assert other.normalize_url("/page") == "http://other-site.com/page"
+        assert crawler.normalize_url("mailto:a@example.com") is None
+
     def test_should_ignore_url(self):
         """测试URL是否应该被忽略"""
         crawler = PageCrawler("http://example.com")
@@ -307,6 +468,61 @@ class TestWebExplorer:
         assert "pages" in results
         assert len(results["pages"]) == 2
 
+    def test_concurrent_explore(self, monkeypatch):
+        """测试并发探索：所有可达页面都被访问，同一域名并发导航数受限，等待渲染时不占用名额"""
+        import explorer as explorer_module
+        monkeypatch.setattr(explorer_module, "PAGE_SETTLE_SECONDS", 0.05)
+
+        site = {
+            "http://example.com/": '<a href="/a">alpha</a><a href="/b">beta</a><a href="/c">gamma</a>',
+            "http://example.com/a": '<p>apple banana cherry</p><a href="/d">delta</a>',
+            "http://example.com/b": '<form><input name="q"><button>search products</button></form>',
+            "http://example.com/c": '<table><tr><td>orders invoices shipping</td></tr></table>',
+            "http://example.com/d": '<ul><li>profile</li><li>settings</li><li>account</li></ul>',
+        }
+        loading = {"current": 0, "max": 0}
+        # 从开始导航到首次读取内容之间的页面数（包括等待渲染的页面）
+        active = {"current": 0, "max": 0}
+
+        class FakePage:
+            def __init__(self):
+                self.url = None
+                self.settling = False
+
+            async def goto(self, url, **kwargs):
+                self.settling = True
+                active["current"] += 1
+                active["max"] = max(active["max"], active["current"])
+                loading["current"] += 1
+                loading["max"] = max(loading["max"], loading["current"])
+                await asyncio.sleep(0.01)
+                loading["current"] -= 1
+                self.url = url
+
+            async def content(self):
+                if self.settling:
+                    self.settling = False
+                    active["current"] -= 1
+                return f"<html><body>{site[self.url]}</body></html>"
+
+            async def close(self):
+                pass
+
+        explorer = WebExplorer(max_depth=3, max_pages=10, concurrency=3, per_domain_concurrency=2)
+        explorer.browser = Mock()
+        explorer.page = FakePage()
+        explorer.context = Mock()
+        explorer.context.new_page = AsyncMock(side_effect=FakePage)
+
+        explore_id = explorer.create_session("http://example.com/")
+        result = asyncio.run(explorer.explore(explore_id))
+
+        assert result["status"] == "completed"
+        assert explorer.state_machine.visited_urls == set(site)
+        assert result["pages_explored"] == len(site)
+        assert loading["max"] <= 2
+        assert active["max"] == 3
+
 
 # 运行测试的入口
 if __name__ == "__main__":
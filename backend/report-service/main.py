@@ -1,23 +1,116 @@
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from sqlalchemy import create_engine, desc
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import desc, text, bindparam, insert, DateTime, MetaData, Table, Column, Integer, String
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from starlette.concurrency import run_in_threadpool
 import os
 # from minio import Minio
 # from minio.error import S3Error
 import io
+import asyncio
+import hashlib
+import itertools
+import time
+import aiofiles
+from collections import defaultdict
 from datetime import datetime
-from jinja2 import Template
+from jinja2 import Environment
 
-# 数据库配置
-DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 数据库配置（异步驱动，数据库访问不阻塞事件循环）
+DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+engine = create_async_engine(DATABASE_URL)
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
-app = FastAPI(title="Report and Evidence Service")
+# SQL语句（模块加载时构建一次，复用SQLAlchemy的编译缓存）
+# 时间列声明为DateTime，SQLite返回的字符串也会被转换为datetime
+INSERT_EVIDENCE_QUERY = text("""
+    INSERT INTO test_evidence (run_id, step_id, type, file_url, metadata)
+    VALUES (:run_id, :step_id, :type, :file_url, :metadata)
+    RETURNING id
+""")
+
+# 批量插入证据使用Core表结构，SQLAlchemy会合并为多行VALUES插入并按参数顺序返回ID
+evidence_table = Table(
+    "test_evidence", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("run_id", Integer),
+    Column("step_id", Integer),
+    Column("type", String),
+    Column("file_url", String),
+    Column("metadata", String),
+)
+INSERT_EVIDENCE_BATCH = insert(evidence_table).returning(
+    evidence_table.c.id, sort_by_parameter_order=True
+)
+
+EVIDENCE_QUERY = text("""
+    SELECT id, run_id, step_id, type, file_url, metadata, created_at
+    FROM test_evidence
+    WHERE run_id = :run_id
+    ORDER BY step_id, created_at
+""").columns(created_at=DateTime)
+
+# 运行信息与步骤结果一次查询取回，支持同时获取多个运行
+RUNS_WITH_STEPS_QUERY = text("""
+    SELECT tr.id, tr.case_id, tr.suite_id, tr.status, tr.start_time, tr.end_time, tr.result,
+           tc.name AS case_name, tc.description AS case_description,
+           sr.id AS step_id, sr.step_index, sr.step_name, sr.status AS step_status,
+           sr.error_message, sr.ai_analysis, sr.screenshot_url, sr.dom_snapshot_url,
+           sr.execution_time, sr.created_at AS step_created_at
+    FROM test_runs tr
+    LEFT JOIN test_cases tc ON tr.case_id = tc.id
+    LEFT JOIN test_step_results sr ON sr.run_id = tr.id
+    WHERE tr.id IN :run_ids
+    ORDER BY tr.id, sr.step_index
+""").bindparams(
+    bindparam("run_ids", expanding=True)
+).columns(start_time=DateTime, end_time=DateTime, step_created_at=DateTime)
+
+# RUNS_WITH_STEPS_QUERY 结果中的运行字段，以及步骤的 (输出字段, 结果列)
+RUN_FIELDS = (
+    "id", "case_id", "suite_id", "status", "start_time", "end_time", "result",
+    "case_name", "case_description"
+)
+STEP_FIELDS = (
+    ("id", "step_id"), ("step_index", "step_index"), ("step_name", "step_name"),
+    ("status", "step_status"), ("error_message", "error_message"),
+    ("ai_analysis", "ai_analysis"), ("screenshot_url", "screenshot_url"),
+    ("dom_snapshot_url", "dom_snapshot_url"), ("execution_time", "execution_time"),
+    ("created_at", "step_created_at")
+)
+
+# 报告版本信息：运行状态、结束时间和步骤结果数量，用于生成ETag
+RUN_VERSION_QUERY = text("""
+    SELECT tr.status, tr.end_time, COUNT(sr.id) AS step_count, MAX(sr.id) AS last_step_id
+    FROM test_runs tr
+    LEFT JOIN test_step_results sr ON sr.run_id = tr.id
+    WHERE tr.id = :run_id
+    GROUP BY tr.id
+""")
+
+LIST_RUNS_QUERY = text("""
+    SELECT tr.id, tr.case_id, tr.suite_id, tr.status, tr.start_time, tr.end_time,
+           tc.name AS case_name
+    FROM test_runs tr
+    LEFT JOIN test_cases tc ON tr.case_id = tc.id
+    ORDER BY tr.created_at DESC
+    LIMIT :limit OFFSET :skip
+""").columns(start_time=DateTime, end_time=DateTime)
+
+LIST_RUNS_BY_STATUS_QUERY = text("""
+    SELECT tr.id, tr.case_id, tr.suite_id, tr.status, tr.start_time, tr.end_time,
+           tc.name AS case_name
+    FROM test_runs tr
+    LEFT JOIN test_cases tc ON tr.case_id = tc.id
+    WHERE tr.status = :status
+    ORDER BY tr.created_at DESC
+    LIMIT :limit OFFSET :skip
+""").columns(start_time=DateTime, end_time=DateTime)
+
+app = FastAPI(title="Report and Evidence Service", default_response_class=ORJSONResponse)
 
 # CORS配置
 app.add_middleware(
@@ -33,13 +126,22 @@ STORAGE_DIR = os.getenv('STORAGE_DIR', './storage')
 if not os.path.exists(STORAGE_DIR):
     os.makedirs(STORAGE_DIR)
 
+# 上传文件分块复制的块大小
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# 上传序号，保证同一秒内上传的文件名不冲突
+_upload_counter = itertools.count()
+
 # 依赖注入
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+async def write_upload_file(upload: UploadFile, file_path: str):
+    """将上传文件按块异步写入目标路径"""
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            await f.write(chunk)
 
 # Pydantic模型
 class EvidenceUpload(BaseModel):
@@ -53,6 +155,23 @@ class EvidenceUpload(BaseModel):
 async def health_check():
     return {"status": "ok", "service": "report-service"}
 
+def evidence_location(run_id: int, step_id: Optional[int], evidence_type: str, filename: str):
+    """生成证据文件的存储路径和访问URL (相对路径)"""
+    timestamp = f"{time.time_ns() // 1_000_000_000}_{next(_upload_counter)}"
+    run_dir = os.path.join(STORAGE_DIR, f"run_{run_id}", f"step_{step_id or 0}")
+    os.makedirs(run_dir, exist_ok=True)
+    
+    file_name = f"{evidence_type}_{timestamp}_{filename}"
+    file_path = os.path.join(run_dir, file_name)
+    file_url = f"/storage/run_{run_id}/step_{step_id or 0}/{file_name}"
+    return file_path, file_url
+
+def remove_files(file_paths: List[str]):
+    """删除已写入的文件（上传失败时清理）"""
+    for file_path in file_paths:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
 # 上传测试证据
 @app.post("/api/reports/evidence")
 async def upload_evidence(
@@ -60,36 +179,32 @@ async def upload_evidence(
     step_id: Optional[int] = None,
     evidence_type: str = "screenshot",
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        # 生成文件路径
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        run_dir = os.path.join(STORAGE_DIR, f"run_{run_id}", f"step_{step_id or 0}")
-        if not os.path.exists(run_dir):
-            os.makedirs(run_dir)
-            
-        file_name = f"{evidence_type}_{timestamp}_{file.filename}"
-        file_path = os.path.join(run_dir, file_name)
-        
-        # 保存文件
-        file_content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(file_content)
-            
-        # 生成访问URL (相对路径)
-        file_url = f"/storage/run_{run_id}/step_{step_id or 0}/{file_name}"
+        # 生成文件路径和访问URL
+        file_path, file_url = evidence_location(run_id, step_id, evidence_type, file.filename)
         
-        # 保存到数据库
-        query = """
-            INSERT INTO test_evidence (run_id, step_id, type, file_url, metadata)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING id
-        """
+        # 分块写入磁盘与保存到数据库并发执行，任一失败则回滚并删除文件
+        write_result, insert_result = await asyncio.gather(
+            write_upload_file(file, file_path),
+            db.execute(INSERT_EVIDENCE_QUERY, {
+                "run_id": run_id,
+                "step_id": step_id,
+                "type": evidence_type,
+                "file_url": file_url,
+                "metadata": None
+            }),
+            return_exceptions=True
+        )
+        for outcome in (write_result, insert_result):
+            if isinstance(outcome, BaseException):
+                await db.rollback()
+                remove_files([file_path])
+                raise outcome
         
-        cursor = db.execute(query, (run_id, step_id, evidence_type, file_url, None))
-        evidence_id = cursor.fetchone()[0]
-        db.commit()
+        evidence_id = insert_result.scalar_one()
+        await db.commit()
         
         return {
             "id": evidence_id,
@@ -100,88 +215,98 @@ async def upload_evidence(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload error: {str(e)}")
 
+# 批量上传测试证据
+@app.post("/api/reports/evidence/batch")
+async def upload_evidence_batch(
+    run_id: int,
+    step_id: Optional[int] = None,
+    evidence_type: str = "screenshot",
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        locations = [evidence_location(run_id, step_id, evidence_type, file.filename) for file in files]
+        file_paths = [file_path for file_path, _ in locations]
+        
+        # 所有文件并发写入磁盘
+        write_results = await asyncio.gather(
+            *(write_upload_file(file, file_path) for file, file_path in zip(files, file_paths)),
+            return_exceptions=True
+        )
+        for outcome in write_results:
+            if isinstance(outcome, BaseException):
+                remove_files(file_paths)
+                raise outcome
+        
+        # 一条语句插入所有记录，只提交一次
+        try:
+            result = await db.execute(INSERT_EVIDENCE_BATCH, [
+                {
+                    "run_id": run_id,
+                    "step_id": step_id,
+                    "type": evidence_type,
+                    "file_url": file_url,
+                    "metadata": None
+                }
+                for _, file_url in locations
+            ])
+            evidence_ids = result.scalars().all()
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            remove_files(file_paths)
+            raise
+        
+        return {
+            "count": len(evidence_ids),
+            "evidence": [
+                {"id": evidence_id, "file_url": file_url}
+                for evidence_id, (_, file_url) in zip(evidence_ids, locations)
+            ],
+            "message": "Evidence uploaded successfully"
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload error: {str(e)}")
+
 # 获取测试证据列表
 @app.get("/api/reports/evidence/{run_id}")
-async def get_evidence(run_id: int, db: Session = Depends(get_db)):
-    query = """
-        SELECT id, run_id, step_id, type, file_url, metadata, created_at
-        FROM test_evidence
-        WHERE run_id = %s
-        ORDER BY step_id, created_at
-    """
+async def get_evidence(run_id: int, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(EVIDENCE_QUERY, {"run_id": run_id})
+    columns = tuple(result.keys())
     
-    cursor = db.execute(query, (run_id,))
-    evidence_list = cursor.fetchall()
+    # 直接返回ORJSONResponse，跳过jsonable_encoder，datetime由orjson原生序列化
+    return ORJSONResponse([dict(zip(columns, row)) for row in result])
+
+async def fetch_runs(db: AsyncSession, run_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """一次查询获取多个测试运行及其步骤结果，按运行ID返回"""
+    result = await db.execute(RUNS_WITH_STEPS_QUERY, {"run_ids": list(run_ids)})
+    rows_by_run = defaultdict(list)
+    for row in result.mappings():
+        rows_by_run[row["id"]].append(row)
     
-    return [
-        {
-            "id": row[0],
-            "run_id": row[1],
-            "step_id": row[2],
-            "type": row[3],
-            "file_url": row[4],
-            "metadata": row[5],
-            "created_at": row[6].isoformat() if row[6] else None
-        }
-        for row in evidence_list
-    ]
+    runs = {}
+    for run_id, rows in rows_by_run.items():
+        run = {field: rows[0][field] for field in RUN_FIELDS}
+        run["steps"] = [
+            {field: step[column] for field, column in STEP_FIELDS}
+            for step in rows
+            # 没有步骤的运行，LEFT JOIN返回一行空步骤
+            if step["step_id"] is not None
+        ]
+        runs[run_id] = run
+    
+    return runs
 
 # 获取测试运行详情
 @app.get("/api/reports/runs/{run_id}")
-async def get_test_run(run_id: int, db: Session = Depends(get_db)):
-    # 获取运行基本信息
-    run_query = """
-        SELECT tr.id, tr.case_id, tr.suite_id, tr.status, tr.start_time, tr.end_time, tr.result,
-               tc.name as case_name, tc.description as case_description
-        FROM test_runs tr
-        LEFT JOIN test_cases tc ON tr.case_id = tc.id
-        WHERE tr.id = %s
-    """
+async def get_test_run(run_id: int, db: AsyncSession = Depends(get_db)):
+    runs = await fetch_runs(db, [run_id])
     
-    cursor = db.execute(run_query, (run_id,))
-    run_row = cursor.fetchone()
-    
-    if not run_row:
+    if run_id not in runs:
         raise HTTPException(status_code=404, detail="Test run not found")
     
-    # 获取步骤结果
-    steps_query = """
-        SELECT id, step_index, step_name, status, error_message, ai_analysis,
-               screenshot_url, dom_snapshot_url, execution_time, created_at
-        FROM test_step_results
-        WHERE run_id = %s
-        ORDER BY step_index
-    """
-    
-    cursor = db.execute(steps_query, (run_id,))
-    steps = cursor.fetchall()
-    
-    return {
-        "id": run_row[0],
-        "case_id": run_row[1],
-        "suite_id": run_row[2],
-        "status": run_row[3],
-        "start_time": run_row[4].isoformat() if run_row[4] else None,
-        "end_time": run_row[5].isoformat() if run_row[5] else None,
-        "result": run_row[6],
-        "case_name": run_row[7],
-        "case_description": run_row[8],
-        "steps": [
-            {
-                "id": step[0],
-                "step_index": step[1],
-                "step_name": step[2],
-                "status": step[3],
-                "error_message": step[4],
-                "ai_analysis": step[5],
-                "screenshot_url": step[6],
-                "dom_snapshot_url": step[7],
-                "execution_time": step[8],
-                "created_at": step[9].isoformat() if step[9] else None
-            }
-            for step in steps
-        ]
-    }
+    return ORJSONResponse(runs[run_id])
 
 # 获取测试运行列表
 @app.get("/api/reports/runs")
@@ -189,51 +314,24 @@ async def list_test_runs(
     skip: int = 0,
     limit: int = 50,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    where_clause = ""
-    params = []
+    params = {"limit": limit, "skip": skip}
     
     if status:
-        where_clause = "WHERE tr.status = %s"
-        params.append(status)
-    
-    query = f"""
-        SELECT tr.id, tr.case_id, tr.suite_id, tr.status, tr.start_time, tr.end_time,
-               tc.name as case_name
-        FROM test_runs tr
-        LEFT JOIN test_cases tc ON tr.case_id = tc.id
-        {where_clause}
-        ORDER BY tr.created_at DESC
-        LIMIT %s OFFSET %s
-    """
+        query = LIST_RUNS_BY_STATUS_QUERY
+        params["status"] = status
+    else:
+        query = LIST_RUNS_QUERY
     
-    params.extend([limit, skip])
+    result = await db.execute(query, params)
+    columns = tuple(result.keys())
     
-    cursor = db.execute(query, tuple(params))
-    runs = cursor.fetchall()
-    
-    return [
-        {
-            "id": row[0],
-            "case_id": row[1],
-            "suite_id": row[2],
-            "status": row[3],
-            "start_time": row[4].isoformat() if row[4] else None,
-            "end_time": row[5].isoformat() if row[5] else None,
-            "case_name": row[6]
-        }
-        for row in runs
-    ]
+    return ORJSONResponse([dict(zip(columns, row)) for row in result])
 
-# 生成HTML测试报告
-@app.get("/api/reports/generate/{run_id}", response_class=HTMLResponse)
-async def generate_report(run_id: int, db: Session = Depends(get_db)):
-    # 获取测试运行详情
-    run_data = await get_test_run(run_id, db)
-    
-    # HTML模板
-    template_str = """
+# HTML报告模板（模块加载时编译一次，开启自动转义）
+REPORT_ENV = Environment(autoescape=True, auto_reload=False)
+REPORT_TEMPLATE = REPORT_ENV.from_string("""
 <!DOCTYPE html>
 <html>
 <head>
@@ -324,10 +422,48 @@ async def generate_report(run_id: int, db: Session = Depends(get_db)):
     </div>
 </body>
 </html>
-    """
+""")
+
+# 已结束的运行，报告内容不再变化
+TERMINAL_RUN_STATUSES = ("passed", "failed")
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断If-None-Match请求头是否包含当前ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (value.strip() for value in if_none_match.split(","))
+    return etag in (value[2:] if value.startswith("W/") else value for value in candidates)
+
+# 生成HTML测试报告
+@app.get("/api/reports/generate/{run_id}", response_class=HTMLResponse)
+async def generate_report(run_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    # 先只查询版本信息，浏览器缓存命中时无需取数据和渲染
+    version = (await db.execute(RUN_VERSION_QUERY, {"run_id": run_id})).mappings().first()
+    if version is None:
+        raise HTTPException(status_code=404, detail="Test run not found")
+    
+    version_key = f"{run_id}-{version['end_time']}-{version['status']}-{version['step_count']}-{version['last_step_id']}"
+    etag = f'"{hashlib.sha256(version_key.encode()).hexdigest()}"'
+    if version["status"] in TERMINAL_RUN_STATUSES:
+        cache_control = "public, max-age=3600, immutable"
+    else:
+        cache_control = "private, max-age=60"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
     
-    template = Template(template_str)
-    html_content = template.render(
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    # 获取测试运行详情
+    runs = await fetch_runs(db, [run_id])
+    if run_id not in runs:
+        raise HTTPException(status_code=404, detail="Test run not found")
+    run_data = runs[run_id]
+    
+    # 模板渲染是CPU密集操作，放到线程池中执行
+    html_content = await run_in_threadpool(
+        REPORT_TEMPLATE.render,
         case_name=run_data.get('case_name', 'Unknown'),
         status=run_data.get('status', 'unknown'),
         start_time=run_data.get('start_time', 'N/A'),
@@ -336,13 +472,19 @@ async def generate_report(run_id: int, db: Session = Depends(get_db)):
         report_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     )
     
-    return HTMLResponse(content=html_content)
+    return HTMLResponse(content=html_content, headers=headers)
 
 # 比较两次测试运行
 @app.get("/api/reports/compare/{run_id1}/{run_id2}")
-async def compare_runs(run_id1: int, run_id2: int, db: Session = Depends(get_db)):
-    run1 = await get_test_run(run_id1, db)
-    run2 = await get_test_run(run_id2, db)
+async def compare_runs(run_id1: int, run_id2: int, db: AsyncSession = Depends(get_db)):
+    # 两次运行通过一次查询获取
+    runs = await fetch_runs(db, [run_id1, run_id2])
+    
+    if run_id1 not in runs or run_id2 not in runs:
+        raise HTTPException(status_code=404, detail="Test run not found")
+    
+    run1, run2 = runs[run_id1], runs[run_id2]
+    steps1, steps2 = run1['steps'], run2['steps']
     
     comparison = {
         "run1": run1,
@@ -351,17 +493,14 @@ async def compare_runs(run_id1: int, run_id2: int, db: Session = Depends(get_db)
     }
     
     # 比较步骤数量
-    if len(run1['steps']) != len(run2['steps']):
+    if len(steps1) != len(steps2):
         comparison['differences'].append({
             "type": "step_count",
-            "message": f"步骤数量不同: {len(run1['steps'])} vs {len(run2['steps'])}"
+            "message": f"步骤数量不同: {len(steps1)} vs {len(steps2)}"
         })
     
     # 比较每个步骤的状态
-    for i in range(min(len(run1['steps']), len(run2['steps']))):
-        step1 = run1['steps'][i]
-        step2 = run2['steps'][i]
-        
+    for i, (step1, step2) in enumerate(zip(steps1, steps2)):
         if step1['status'] != step2['status']:
             comparison['differences'].append({
                 "type": "step_status",
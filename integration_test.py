@@ -2,6 +2,9 @@ import requests
 import time
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # 配置
 BASE_URL = "http://localhost:3000"
@@ -10,6 +13,31 @@ EXEC_SERVICE_URL = "http://localhost:3001"
 REPORT_SERVICE_URL = "http://localhost:8002"
 AI_SERVICE_URL = "http://localhost:8003"
 
+# 请求超时 (连接, 读取)
+REQUEST_TIMEOUT = (2, 10)
+# 执行用例会同步启动浏览器并逐步执行，读取超时需要覆盖整个运行过程
+EXEC_RUN_TIMEOUT = (2, 300)
+
+# 全局会话：复用连接，对网关错误和连接失败按指数退避重试
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+def check_health(url, name):
+    try:
+        response = SESSION.get(f"{url}/health", timeout=2)
+        if response.status_code == 200:
+            return f"✅ {name} is healthy"
+        else:
+            return f"❌ {name} returned {response.status_code}"
+    except Exception as e:
+        return f"❌ {name} connection failed: {str(e)}"
+
 def test_health_checks():
     print("Testing health checks...")
     services = [
@@ -19,15 +47,12 @@ def test_health_checks():
         (AI_SERVICE_URL, "AI Service")
     ]
     
-    for url, name in services:
-        try:
-            response = requests.get(f"{url}/health")
-            if response.status_code == 200:
-                print(f"✅ {name} is healthy")
-            else:
-                print(f"❌ {name} returned {response.status_code}")
-        except Exception as e:
-            print(f"❌ {name} connection failed: {str(e)}")
+    # 并发检查所有服务，结果按服务顺序输出
+    with ThreadPoolExecutor(max_workers=len(services)) as executor:
+        results = list(executor.map(lambda s: check_health(*s), services))
+    
+    for result in results:
+        print(result)
 
 def test_create_case():
     print("\nTesting case creation...")
@@ -58,7 +83,7 @@ def test_create_case():
     }
     
     try:
-        response = requests.post(f"{CASE_SERVICE_URL}/api/cases", json=case_data)
+        response = SESSION.post(f"{CASE_SERVICE_URL}/api/cases", json=case_data, timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             case_id = response.json()["id"]
             print(f"✅ Case created with ID: {case_id}")
@@ -77,7 +102,7 @@ def test_run_case(case_id):
         return
 
     try:
-        response = requests.post(f"{EXEC_SERVICE_URL}/api/exec/run", json={"case_id": case_id})
+        response = SESSION.post(f"{EXEC_SERVICE_URL}/api/exec/run", json={"case_id": case_id}, timeout=EXEC_RUN_TIMEOUT)
         if response.status_code == 200:
             run_data = response.json()
             run_id = run_data["run_id"]
@@ -104,7 +129,7 @@ def test_get_report(run_id):
         return
 
     try:
-        response = requests.get(f"{REPORT_SERVICE_URL}/api/reports/runs/{run_id}")
+        response = SESSION.get(f"{REPORT_SERVICE_URL}/api/reports/runs/{run_id}", timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             report = response.json()
             print(f"✅ Report retrieved successfully")
@@ -129,7 +154,7 @@ def test_ai_generation():
     
     try:
         # 1. Create recording
-        res1 = requests.post(f"{CASE_SERVICE_URL}/api/cases/recordings", json=recording_data)
+        res1 = SESSION.post(f"{CASE_SERVICE_URL}/api/cases/recordings", json=recording_data, timeout=REQUEST_TIMEOUT)
         if res1.status_code != 200:
             print(f"❌ Failed to upload recording: {res1.text}")
             return
@@ -150,11 +175,14 @@ if __name__ == "__main__":
     # Wait for services to be ready (simulated)
     # time.sleep(5) 
     
-    test_health_checks()
-    case_id = test_create_case()
-    run_id = test_run_case(case_id)
-    test_get_report(run_id)
-    test_ai_generation()
+    try:
+        test_health_checks()
+        case_id = test_create_case()
+        run_id = test_run_case(case_id)
+        test_get_report(run_id)
+        test_ai_generation()
+    finally:
+        SESSION.close()
     
     print("\n============================")
     print("🏁 Integration Tests Completed")
@@ -3,113 +3,149 @@
 快速测试脚本 - 检查服务是否正常启动
 """
 
-import requests
-import json
-import time
+import asyncio
+import aiohttp
+import orjson
+import os
+import sys
+from collections import namedtuple
 from datetime import datetime
 
-print("=" * 50)
-print("AI Test Tool - 快速服务测试")
-print(f"测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-print("=" * 50)
-
-# 服务列表
-services = [
-    ("前端", "http://localhost:5173", None),
-    ("API 网关", "http://localhost:3000", "/health"),
-    ("用例服务", "http://localhost:8001", "/health"),
-    ("执行服务", "http://localhost:3001", "/health"),
-    ("报告服务", "http://localhost:8002", "/health"),
-    ("AI 服务", "http://localhost:8003", "/health"),
-    ("探索服务", "http://localhost:8004", "/health"),
-]
+from script_common import count_cases, create_test_case, error_message, wait_ready
+
+# 只有在终端运行或带 -v 参数时才解析并打印 /health 响应内容
+VERBOSE = sys.stdout.isatty() or "-v" in sys.argv
+
+# 输出先缓存在内存中，每个阶段结束时一次性写出，避免逐行写 stdout
+out = []
+
+
+def flush_output():
+    """写出并清空已缓存的输出"""
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
+    out.clear()
+
+
+out.append("=" * 50)
+out.append("AI Test Tool - 快速服务测试")
+out.append(f"测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+out.append("=" * 50)
+
+# 请求异常类型 -> 提示信息，按异常类的 MRO 查找，未列出的类型显示原始错误
+# ServerTimeoutError 同时是连接错误和超时，按超时处理
+ERR_MSGS = {
+    aiohttp.ServerTimeoutError: "请求超时",
+    asyncio.TimeoutError: "请求超时",
+    aiohttp.ClientConnectionError: "连接失败",
+}
+
+# 服务检查项：名称, 地址, 端点, 请求方法, 超时（秒）
+Probe = namedtuple("Probe", "name url endpoint method timeout", defaults=("", "GET", 5))
+
+# 前端只需确认可访问，用 HEAD 只取响应头；/health 的响应内容需要打印，用 GET
+PROBES = (
+    Probe("前端", "http://localhost:5173", method="HEAD"),
+    Probe("API 网关", "http://localhost:3000", "/health"),
+    Probe("用例服务", "http://localhost:8001", "/health"),
+    Probe("执行服务", "http://localhost:3001", "/health"),
+    Probe("报告服务", "http://localhost:8002", "/health"),
+    Probe("AI 服务", "http://localhost:8003", "/health"),
+    Probe("探索服务", "http://localhost:8004", "/health"),
+)
+
+# 各检查项的完整URL，在导入时拼接一次
+PROBE_URLS = tuple(p.url + p.endpoint for p in PROBES)
+
+# 所有服务检查的总时限（秒），单个请求另有 5 秒超时
+PROBE_DEADLINE = 8.0
+
+# 同时进行的请求数上限，避免单进程的本地服务被突发请求压垮
+MAX_CONCURRENCY = int(os.getenv("AITEST_MAX_CONCURRENCY", "4"))
+
+async def probe(session, sem, p, full_url):
+    """检查单个服务，返回 (名称, 地址, 是否正常, 状态码, 响应内容或错误信息)"""
+    try:
+        async with sem:
+            async with session.request(p.method, full_url, allow_redirects=True,
+                                       timeout=aiohttp.ClientTimeout(total=p.timeout)) as response:
+                data = None
+                if VERBOSE and response.status == 200 and p.endpoint == "/health":
+                    try:
+                        data = orjson.loads(await response.read())
+                    except Exception:
+                        pass
+                return p.name, p.url, response.status == 200, response.status, data
+    except Exception as e:
+        return p.name, p.url, False, None, error_message(e, ERR_MSGS)
+
+
+async def check_services():
+    """并发检查所有服务，结果按服务列表顺序返回
+
+    总耗时不超过 PROBE_DEADLINE 秒，届时仍未完成的检查记为超时并取消
+    """
+    connector = aiohttp.TCPConnector(limit=16, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        sem = asyncio.Semaphore(MAX_CONCURRENCY)
+        tasks = [asyncio.create_task(probe(session, sem, p, full_url)) for p, full_url in zip(PROBES, PROBE_URLS)]
+        _, pending = await asyncio.wait(tasks, timeout=PROBE_DEADLINE)
+        for task in pending:
+            task.cancel()
+        return [
+            (p.name, p.url, False, None, "请求超时") if task in pending else task.result()
+            for task, p in zip(tasks, PROBES)
+        ]
+
 
 # 等待服务启动
-print("\n等待服务启动...")
-time.sleep(2)
+out.append("\n等待服务启动...")
+wait_ready(PROBE_URLS, max_workers=MAX_CONCURRENCY)
 
 # 测试每个服务
 all_ok = True
-for name, url, endpoint in services:
-    print(f"\n检查 {name}:")
-    try:
-        if endpoint:
-            full_url = url + endpoint
-        else:
-            full_url = url
-
-        response = requests.get(full_url, timeout=5)
-
-        if response.status_code == 200:
-            print(f"  ✓ {name} 正常 ({url})")
-            if endpoint == "/health":
-                try:
-                    data = response.json()
-                    print(f"    响应: {data}")
-                except:
-                    pass
-        else:
-            print(f"  ✗ {name} 响应异常: {response.status_code}")
-            all_ok = False
-    except requests.exceptions.ConnectionError:
-        print(f"  ✗ {name} 连接失败")
+for name, url, ok, status, detail in asyncio.run(check_services()):
+    out.append(f"\n检查 {name}:")
+    if ok:
+        out.append(f"  ✓ {name} 正常 ({url})")
+        if detail is not None:
+            out.append(f"    响应: {detail}")
+    elif status is not None:
+        out.append(f"  ✗ {name} 响应异常: {status}")
         all_ok = False
-    except requests.exceptions.Timeout:
-        print(f"  ✗ {name} 请求超时")
-        all_ok = False
-    except Exception as e:
-        print(f"  ✗ {name} 错误: {str(e)}")
+    else:
+        out.append(f"  ✗ {name} {detail}")
         all_ok = False
 
 # 总结
-print("\n" + "=" * 50)
+out.append("\n" + "=" * 50)
 if all_ok:
-    print("🎉 所有服务正常运行！")
+    out.append("🎉 所有服务正常运行！")
 else:
-    print("⚠️  部分服务异常，请检查日志")
-print("=" * 50)
+    out.append("⚠️  部分服务异常，请检查日志")
+out.append("=" * 50)
+# 服务检查阶段结束，先输出结果，后续 API 测试卡住时也能看到
+flush_output()
 
 # 测试用例服务 API
-print("\n测试用例服务 API...")
+out.append("\n测试用例服务 API...")
 try:
-    # 创建测试用例
-    test_case = {
-        "name": "测试用例示例",
-        "description": "这是一个测试用例",
-        "steps": [
-            {
-                "type": "navigate",
-                "url": "https://example.com",
-                "description": "导航到示例网站"
-            },
-            {
-                "type": "click",
-                "selector": "button",
-                "description": "点击按钮"
-            }
-        ]
-    }
-
-    response = requests.post(
-        "http://localhost:8001/api/cases",
-        json=test_case,
-        headers={"Content-Type": "application/json"}
-    )
+    response = create_test_case()
 
     if response.status_code == 200:
-        print("✓ 创建测试用例成功")
-        case_data = response.json()
-        print(f"  用例ID: {case_data.get('id')}")
-
-        # 获取用例列表
-        response = requests.get("http://localhost:8001/api/cases")
-        if response.status_code == 200:
-            cases = response.json()
-            print(f"✓ 获取用例列表成功，共 {len(cases)} 个用例")
+        out.append("✓ 创建测试用例成功")
+        case_data = orjson.loads(response.content)
+        out.append(f"  用例ID: {case_data.get('id')}")
+
+        # 获取用例数量
+        status, total = count_cases()
+        if status == 200:
+            out.append(f"✓ 获取用例列表成功，共 {total} 个用例")
     else:
-        print(f"✗ 创建测试用例失败: {response.status_code}")
+        out.append(f"✗ 创建测试用例失败: {response.status_code}")
 
 except Exception as e:
-    print(f"✗ 测试用例服务 API 错误: {str(e)}")
+    out.append(f"✗ 测试用例服务 API 错误: {str(e)}")
 
-print("\n测试完成！")
\ No newline at end of file
+out.append("\n测试完成！")
+flush_output()
@@ -0,0 +1,111 @@
+"""
+测试脚本公共部分
+quick-test.py 和 test-integration.py 共用的会话、请求体和辅助函数
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import time
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+
+# 全局会话：复用连接（keep-alive）
+# 不使用 HTTP/2：各服务是不同端口（不同源），无法复用同一条连接，且明文 http:// 下
+# httpx 不会协商 h2；每个服务保持一条 HTTP/1.1 长连接已能省去重复握手
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=1, backoff_factor=0.1)
+))
+
+# 请求超时 (连接, 读取)
+REQUEST_TIMEOUT = (2, 10)
+
+# POST JSON 请求体时使用的请求头
+JSON_HEADERS = {"Content-Type": "application/json"}
+# 只取用例总数：服务端通过 X-Total-Count / Content-Range 返回数量
+COUNT_HEADERS = {"Accept-Encoding": "gzip", "Prefer": "count=exact"}
+
+# 用例服务列表接口
+CASES_URL = "http://localhost:8001/api/cases"
+
+# 创建测试用例的请求体，导入时序列化一次
+TEST_CASE_BODY = orjson.dumps({
+    "name": "测试用例示例",
+    "description": "这是一个测试用例",
+    "steps": [
+        {
+            "type": "navigate",
+            "url": "https://example.com",
+            "description": "导航到示例网站"
+        },
+        {
+            "type": "click",
+            "selector": "button",
+            "description": "点击按钮"
+        }
+    ]
+})
+
+# 等待服务启动：最多等待的秒数和轮询间隔
+STARTUP_WAIT = 2.0
+STARTUP_POLL_INTERVAL = 0.1
+
+# 请求异常类型 -> 提示信息，按异常类的 MRO 查找，未列出的类型显示原始错误
+ERR_MSGS = {
+    requests.exceptions.ConnectionError: "连接失败",
+    requests.exceptions.Timeout: "请求超时",
+}
+
+def error_message(e, err_msgs=ERR_MSGS):
+    """根据异常类型表返回异常对应的提示信息"""
+    for cls in type(e).__mro__:
+        if cls in err_msgs:
+            return err_msgs[cls]
+    return f"错误: {str(e)}"
+
+def responds(url, timeout):
+    """服务是否已在监听：收到任何 HTTP 响应即视为已启动"""
+    try:
+        SESSION.head(url, timeout=timeout)
+        return True
+    except requests.exceptions.RequestException:
+        return False
+
+def wait_ready(urls, deadline=STARTUP_WAIT, interval=STARTUP_POLL_INTERVAL, max_workers=None):
+    """轮询所有服务直到全部响应（任何状态码都算），最多等待 deadline 秒"""
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers or len(urls)) as executor:
+        while True:
+            remaining = deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                return False
+            if all(executor.map(lambda url: responds(url, remaining), urls)):
+                return True
+            time.sleep(interval)
+
+def total_count(response):
+    """从 X-Total-Count 或 Content-Range（如 0-9/42）响应头读取总数，没有时返回 None"""
+    total = response.headers.get("X-Total-Count")
+    if total is None:
+        content_range = response.headers.get("Content-Range", "")
+        total = content_range.rpartition("/")[2] if "/" in content_range else None
+    return int(total) if total and total.isdigit() else None
+
+def count_cases():
+    """获取用例总数；服务端不支持计数响应头时回退为拉取完整列表计数"""
+    response = SESSION.get(CASES_URL, params={"limit": 0}, headers=COUNT_HEADERS, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 200:
+        total = total_count(response)
+        if total is not None:
+            return response.status_code, total
+    response = SESSION.get(CASES_URL, headers=COUNT_HEADERS, timeout=REQUEST_TIMEOUT)
+    if response.status_code != 200:
+        return response.status_code, None
+    return response.status_code, len(orjson.loads(response.content))
+
+def create_test_case():
+    """用固定请求体创建测试用例，返回响应"""
+    return SESSION.post(CASES_URL, data=TEST_CASE_BODY, headers=JSON_HEADERS, timeout=REQUEST_TIMEOUT)
@@ -4,87 +4,105 @@
 测试网页探索和用例生成功能
 """
 
-import requests
-import json
+import asyncio
+import aiohttp
+import orjson
 import time
 
-def test_explorer_service():
-    """测试探索服务"""
-    print("=== 测试探索服务 ===")
-
-    # 测试网页探索
-    explore_data = {
-        "url": "https://example.com",
-        "maxPages": 2,
-        "clickSelectors": ["a", "button"],
-        "waitTime": 2
+# POST JSON 请求体时使用的请求头
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# 网页探索的请求体，导入时序列化一次
+EXPLORE_BODY = orjson.dumps({
+    "url": "https://example.com",
+    "maxPages": 2,
+    "clickSelectors": ["a", "button"],
+    "waitTime": 2
+})
+
+# AI用例生成的请求体，导入时序列化一次
+AI_REQUEST_BODY = orjson.dumps({
+    "prompt": "为登录页面生成一个测试用例",
+    "context": {
+        "url": "https://example.com/login",
+        "elements": ["username", "password", "login button"]
     }
+})
+
+
+async def test_explorer_service(session):
+    """测试探索服务，返回该测试的输出文本"""
+    out = ["=== 测试探索服务 ==="]
 
     try:
-        print("开始探索网页...")
-        response = requests.post(
+        out.append("开始探索网页...")
+        async with session.post(
             "http://localhost:8004/api/explore",
-            json=explore_data,
-            headers={"Content-Type": "application/json"},
-            timeout=30
-        )
-
-        if response.status_code == 200:
-            result = response.json()
-            print("✓ 探索成功")
-            print(f"  发现页面数: {result.get('pagesFound', 0)}")
-            print(f"  生成用例数: {result.get('casesGenerated', 0)}")
+            data=EXPLORE_BODY,
+            headers=JSON_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=30)
+        ) as response:
+            body = await response.read()
+
+        if response.status == 200:
+            result = orjson.loads(body)
+            out.append("✓ 探索成功")
+            out.append(f"  发现页面数: {result.get('pagesFound', 0)}")
+            out.append(f"  生成用例数: {result.get('casesGenerated', 0)}")
 
             # 显示生成的测试用例
             if 'testCases' in result and result['testCases']:
-                print("\n生成的测试用例:")
+                out.append("\n生成的测试用例:")
                 for i, case in enumerate(result['testCases'][:3]):  # 只显示前3个
-                    print(f"\n用例 {i+1}:")
-                    print(f"  名称: {case.get('name')}")
-                    print(f"  步骤数: {len(case.get('steps', []))}")
+                    out.append(f"\n用例 {i+1}:")
+                    out.append(f"  名称: {case.get('name')}")
+                    out.append(f"  步骤数: {len(case.get('steps', []))}")
                     for step in case.get('steps', [])[:2]:  # 只显示前2步
-                        print(f"    - {step.get('description')}")
+                        out.append(f"    - {step.get('description')}")
         else:
-            print(f"✗ 探索失败: {response.status_code}")
-            print(f"  响应: {response.text}")
+            out.append(f"✗ 探索失败: {response.status}")
+            out.append(f"  响应: {body.decode(errors='replace')}")
 
-    except requests.exceptions.Timeout:
-        print("✗ 探索超时")
+    except asyncio.TimeoutError:
+        out.append("✗ 探索超时")
     except Exception as e:
-        print(f"✗ 探索错误: {str(e)}")
-
-def test_ai_service():
-    """测试AI服务"""
-    print("\n=== 测试AI服务 ===")
-
-    # 测试AI用例生成
-    ai_request = {
-        "prompt": "为登录页面生成一个测试用例",
-        "context": {
-            "url": "https://example.com/login",
-            "elements": ["username", "password", "login button"]
-        }
-    }
+        out.append(f"✗ 探索错误: {str(e)}")
+
+    return "\n".join(out)
+
+async def test_ai_service(session):
+    """测试AI服务，返回该测试的输出文本"""
+    out = ["\n=== 测试AI服务 ==="]
 
     try:
-        print("生成AI测试用例...")
-        response = requests.post(
+        out.append("生成AI测试用例...")
+        async with session.post(
             "http://localhost:8003/api/generate-case",
-            json=ai_request,
-            headers={"Content-Type": "application/json"},
-            timeout=15
-        )
-
-        if response.status_code == 200:
-            result = response.json()
-            print("✓ AI用例生成成功")
-            print(f"  响应: {json.dumps(result, indent=2, ensure_ascii=False)}")
+            data=AI_REQUEST_BODY,
+            headers=JSON_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=15)
+        ) as response:
+            body = await response.read()
+
+        if response.status == 200:
+            result = orjson.loads(body)
+            out.append("✓ AI用例生成成功")
+            out.append(f"  响应: {orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()}")
         else:
-            print(f"✗ AI用例生成失败: {response.status_code}")
-            print(f"  响应: {response.text}")
+            out.append(f"✗ AI用例生成失败: {response.status}")
+            out.append(f"  响应: {body.decode(errors='replace')}")
 
+    except asyncio.TimeoutError:
+        out.append("✗ AI服务超时")
     except Exception as e:
-        print(f"✗ AI服务错误: {str(e)}")
+        out.append(f"✗ AI服务错误: {str(e)}")
+
+    return "\n".join(out)
+
+async def run_tests():
+    """两个测试访问不同服务、互不依赖，并发执行后按固定顺序输出"""
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+        return await asyncio.gather(test_explorer_service(session), test_ai_service(session))
 
 if __name__ == "__main__":
     print("AI Test Tool - 探索服务测试")
@@ -93,7 +111,7 @@ if __name__ == "__main__":
     # 等待服务启动
     time.sleep(2)
 
-    test_explorer_service()
-    test_ai_service()
+    for report in asyncio.run(run_tests()):
+        print(report)
 
-    print("\n测试完成！")
\ No newline at end of file
+    print("\n测试完成！")
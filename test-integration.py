@@ -6,117 +6,141 @@ AI Test Tool 集成测试脚本
 
 import requests
 import time
-import json
+import orjson
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-# 服务配置
-services = {
-    "api_gateway": {
-        "url": "http://localhost:3000",
-        "endpoints": ["/health"]
-    },
-    "case_service": {
-        "url": "http://localhost:8001",
-        "endpoints": ["/health"]
-    },
-    "exec_service": {
-        "url": "http://localhost:3001",
-        "endpoints": ["/health"]
-    },
-    "report_service": {
-        "url": "http://localhost:8002",
-        "endpoints": ["/health"]
-    },
-    "ai_service": {
-        "url": "http://localhost:8003",
-        "endpoints": ["/health"]
-    },
-    "explorer_service": {
-        "url": "http://localhost:8004",
-        "endpoints": ["/health"]
+from script_common import SESSION, count_cases, create_test_case, error_message, wait_ready
+
+# 服务配置：名称, 地址, 端点, 超时（秒）
+Service = namedtuple("Service", "name url endpoints timeout", defaults=(("/health",), 5))
+
+SERVICES = (
+    Service("api_gateway", "http://localhost:3000"),
+    Service("case_service", "http://localhost:8001"),
+    Service("exec_service", "http://localhost:3001"),
+    Service("report_service", "http://localhost:8002"),
+    Service("ai_service", "http://localhost:8003"),
+    Service("explorer_service", "http://localhost:8004"),
+)
+
+# 检查项：(服务, 端点, 完整URL)，完整URL在导入时拼接一次
+PROBES = tuple(
+    (service, endpoint, service.url + endpoint)
+    for service in SERVICES
+    for endpoint in service.endpoints
+)
+
+# 健康检查结果缓存时间（秒），缓存期内重复检查直接返回上次结果
+HEALTH_CACHE_TTL = 30
+# 服务 -> (过期时间, 是否健康)
+_health_cache = {}
+
+def check_all_services():
+    """检查所有服务：未命中缓存的端点作为一批并发请求，再按服务顺序输出结果"""
+    pending = [
+        (service, endpoint, url)
+        for service, endpoint, url in PROBES
+        if _cached_health(service) is None
+    ]
+    responses = {}
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            fetched = executor.map(
+                fetch_endpoint,
+                [url for _, _, url in pending],
+                [service.timeout for service, _, _ in pending]
+            )
+            responses = {
+                (service, endpoint): response
+                for (service, endpoint, _), response in zip(pending, fetched)
+            }
+
+    return {
+        service.name: check_service_health(service, responses)
+        for service in SERVICES
     }
-}
 
-def check_service_health(service_name, service_config):
-    """检查服务健康状态"""
-    base_url = service_config["url"]
-    results = []
+def _cached_health(service):
+    """返回未过期的缓存结果，没有则返回 None"""
+    cached = _health_cache.get(service)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    return None
+
+def check_service_health(service, responses=None):
+    """检查服务健康状态（结果缓存 HEALTH_CACHE_TTL 秒）
 
-    print(f"\n=== 检查 {service_name} ===")
-    print(f"服务地址: {base_url}")
+    responses 为批量请求得到的 {(服务, 端点): 响应或异常}，缺少的端点单独请求
+    """
+    print(f"\n=== 检查 {service.name} ===")
+    print(f"服务地址: {service.url}")
 
-    for endpoint in service_config["endpoints"]:
-        url = base_url + endpoint
+    cached = _cached_health(service)
+    if cached is not None:
+        print("缓存: HIT")
+        return cached
+
+    print("缓存: MISS")
+    responses = responses or {}
+    results = []
+    for endpoint in service.endpoints:
+        if (service, endpoint) in responses:
+            response = responses[(service, endpoint)]
+        else:
+            response = fetch_endpoint(service.url + endpoint, service.timeout)
+        results.append(report_endpoint(endpoint, response))
+    is_healthy = all(results)
+    _health_cache[service] = (time.monotonic() + HEALTH_CACHE_TTL, is_healthy)
+    return is_healthy
+
+def fetch_endpoint(url, timeout=5):
+    """请求单个端点，返回响应；请求失败时返回异常对象而不是抛出"""
+    try:
+        return SESSION.get(url, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        return e
+
+def report_endpoint(endpoint, response):
+    """输出单个端点的检查结果，状态码为200时返回 True"""
+    if isinstance(response, Exception):
+        print(f"✗ {endpoint}: {error_message(response)}")
+        return False
+
+    if response.status_code != 200:
+        print(f"✗ {endpoint}: 状态码 {response.status_code}")
+        return False
+
+    print(f"✓ {endpoint}: 状态码 {response.status_code}")
+    # 如果是健康检查，打印响应内容
+    if endpoint == "/health":
         try:
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                print(f"✓ {endpoint}: 状态码 {response.status_code}")
-                results.append(True)
-
-                # 如果是健康检查，打印响应内容
-                if endpoint == "/health":
-                    try:
-                        data = response.json()
-                        print(f"  响应: {json.dumps(data, indent=2, ensure_ascii=False)}")
-                    except:
-                        print(f"  响应: {response.text}")
-            else:
-                print(f"✗ {endpoint}: 状态码 {response.status_code}")
-                results.append(False)
-        except requests.exceptions.ConnectionError:
-            print(f"✗ {endpoint}: 连接失败")
-            results.append(False)
-        except requests.exceptions.Timeout:
-            print(f"✗ {endpoint}: 请求超时")
-            results.append(False)
-        except Exception as e:
-            print(f"✗ {endpoint}: 错误 - {str(e)}")
-            results.append(False)
-
-    return all(results)
+            data = orjson.loads(response.content)
+            print(f"  响应: {orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()}")
+        except:
+            print(f"  响应: {response.text}")
+    return True
 
 def test_case_service_api():
     """测试用例服务 API"""
     print("\n=== 测试用例服务 API ===")
 
-    # 创建测试用例
-    test_case = {
-        "name": "测试用例示例",
-        "description": "这是一个测试用例",
-        "steps": [
-            {
-                "type": "navigate",
-                "url": "https://example.com",
-                "description": "导航到示例网站"
-            },
-            {
-                "type": "click",
-                "selector": "button",
-                "description": "点击按钮"
-            }
-        ]
-    }
-
     try:
         # 创建用例
-        response = requests.post(
-            "http://localhost:8001/api/cases",
-            json=test_case,
-            headers={"Content-Type": "application/json"}
-        )
+        response = create_test_case()
 
         if response.status_code == 200:
             print("✓ 创建测试用例成功")
-            case_data = response.json()
+            case_data = orjson.loads(response.content)
             print(f"  用例ID: {case_data.get('id')}")
 
-            # 获取用例列表
-            response = requests.get("http://localhost:8001/api/cases")
-            if response.status_code == 200:
-                cases = response.json()
-                print(f"✓ 获取用例列表成功，共 {len(cases)} 个用例")
+            # 获取用例数量
+            status, total = count_cases()
+            if status == 200:
+                print(f"✓ 获取用例列表成功，共 {total} 个用例")
             else:
-                print(f"✗ 获取用例列表失败: {response.status_code}")
+                print(f"✗ 获取用例列表失败: {status}")
         else:
             print(f"✗ 创建测试用例失败: {response.status_code}")
             print(f"  响应: {response.text}")
@@ -128,16 +152,17 @@ def test_frontend_routing():
     print("\n=== 测试前端路由 ===")
 
     try:
-        # 检查前端是否可访问
-        response = requests.get("http://localhost:5173", timeout=5)
+        # 检查前端是否可访问（HEAD 只取响应头，不下载页面内容）
+        response = SESSION.head("http://localhost:5173", allow_redirects=True, timeout=5)
         if response.status_code == 200:
             print("✓ 前端服务可访问")
-        else:
-            print(f"✗ 前端服务响应异常: {response.status_code}")
+            return True
+        print(f"✗ 前端服务响应异常: {response.status_code}")
     except requests.exceptions.ConnectionError:
         print("✗ 前端服务未启动")
     except Exception as e:
         print(f"✗ 前端服务测试错误: {str(e)}")
+    return False
 
 def main():
     """主测试函数"""
@@ -148,29 +173,26 @@ def main():
 
     # 等待服务启动
     print("\n等待服务启动...")
-    time.sleep(2)
+    wait_ready([url for _, _, url in PROBES])
 
-    # 检查所有服务
-    all_healthy = True
-    for service_name, config in services.items():
-        is_healthy = check_service_health(service_name, config)
-        all_healthy = all_healthy and is_healthy
+    # 检查所有服务（结果保留给汇总使用，不再重复检查）
+    health = check_all_services()
+    all_healthy = all(health.values())
 
     # 测试特定服务
     test_case_service_api()
-    test_frontend_routing()
+    frontend_ok = test_frontend_routing()
 
     # 汇总结果
     print("\n" + "=" * 60)
     print("测试结果汇总:")
     print("=" * 60)
 
-    for service_name, config in services.items():
-        is_healthy = check_service_health(service_name, config)
+    for service_name, is_healthy in health.items():
         status = "✓ 正常" if is_healthy else "✗ 异常"
         print(f"{service_name:20} {status}")
 
-    print(f"\前端服务            {'✓ 正常' if requests.get('http://localhost:5173', timeout=1).status_code == 200 else '✗ 异常'}")
+    print(f"\n前端服务            {'✓ 正常' if frontend_ok else '✗ 异常'}")
 
     if all_healthy:
         print("\n🎉 所有服务正常运行！")